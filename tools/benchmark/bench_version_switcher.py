@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Oxify version switcher that run without network or Gradle.
+
+Every scenario runs against the local metadata stub server (stub_server.py)
+and a throwaway copy of the project whose gradlew is fake_gradlew.py, so the
+numbers only depend on the configured latency and task durations.
+
+Scenarios:
+    metadata-serial / metadata-concurrent   cold-cache metadata resolution
+    metadata-warm                           resolution from a warm cache
+    gradle-multi / gradle-single            one gradlew launch per step wave vs one pipelined run
+    switch-*                                VersionSwitcher.switch_version end to end
+
+Usage:
+    python bench_version_switcher.py
+    python bench_version_switcher.py --latency 0.3 --startup 2 --repeat 5 --json bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TOOLS_DIR))
+
+import version_switcher  # noqa: E402
+from stub_server import MetadataStubServer  # noqa: E402
+
+REPO_ROOT = TOOLS_DIR.parent
+FAKE_GRADLEW = Path(__file__).resolve().parent / "fake_gradlew.py"
+
+# Files the switcher reads or rewrites, copied into every benchmark project
+PROJECT_FILES = [
+    "gradle.properties",
+    "build.gradle",
+    "settings.gradle",
+    "gradle/wrapper/gradle-wrapper.properties",
+    "src/main/resources/fabric.mod.json",
+]
+
+def make_project(workdir: Path) -> Path:
+    """Create a minimal copy of the project whose gradlew is the fake one"""
+    project = Path(tempfile.mkdtemp(prefix="project-", dir=workdir))
+    for relative in PROJECT_FILES:
+        target = project / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(REPO_ROOT / relative, target)
+    gradlew = project / "gradlew"
+    shutil.copy2(FAKE_GRADLEW, gradlew)
+    gradlew.chmod(0o755)
+    return project
+
+class Benchmark:
+    def __init__(self, server: MetadataStubServer, workdir: Path, minecraft_version: str, mod_version: str):
+        self.server = server
+        self.workdir = workdir
+        self.minecraft_version = minecraft_version
+        self.mod_version = mod_version
+
+    def switcher(self, project: Path, cache_dir: Path = None) -> version_switcher.VersionSwitcher:
+        cache_dir = cache_dir or Path(tempfile.mkdtemp(prefix="cache-", dir=self.workdir))
+        return version_switcher.VersionSwitcher(project,
+                                                version_switcher.MetadataCache(cache_dir),
+                                                version_switcher.create_session(),
+                                                fabric_meta_url=self.server.fabric_meta_url,
+                                                github_api_url=self.server.github_api_url,
+                                                fabric_maven_url=self.server.fabric_maven_url)
+
+    def metadata(self, concurrent: bool) -> float:
+        switcher = self.switcher(make_project(self.workdir))
+        _, timings = switcher.fetch_metadata(self.minecraft_version, concurrent=concurrent)
+        return timings["wall_clock"]
+
+    def metadata_warm(self) -> float:
+        project = make_project(self.workdir)
+        cache_dir = Path(tempfile.mkdtemp(prefix="cache-", dir=self.workdir))
+        self.switcher(project, cache_dir).fetch_metadata(self.minecraft_version)
+        _, timings = self.switcher(project, cache_dir).fetch_metadata(self.minecraft_version)
+        return timings["wall_clock"]
+
+    def gradle(self, pipeline: bool) -> float:
+        switcher = self.switcher(make_project(self.workdir))
+        start = time.perf_counter()
+        switcher.run_gradle_phase(list(version_switcher.GRADLE_TASK_TIMEOUTS), pipeline=pipeline)
+        return time.perf_counter() - start
+
+    def switch(self, concurrent: bool, pipeline: bool, phases: Dict[str, List[float]]) -> float:
+        switcher = self.switcher(make_project(self.workdir))
+        start = time.perf_counter()
+        success = switcher.switch_version(self.minecraft_version, self.mod_version, auto_yes=True,
+                                          concurrent=concurrent, pipeline=pipeline)
+        elapsed = time.perf_counter() - start
+        if not success:
+            raise RuntimeError("switch_version failed during the benchmark")
+        for phase in switcher.report.data["phases"]:
+            phases.setdefault(phase["name"], []).append(phase["duration"])
+        return elapsed
+
+def measure(func: Callable[[], float], repeat: int, verbose: bool) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        if verbose:
+            samples.append(func())
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                samples.append(func())
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Oxify version switcher offline")
+    parser.add_argument('--latency', type=float, default=0.25,
+                        help='Stub server latency per request in seconds (default: 0.25)')
+    parser.add_argument('--startup', type=float, default=1.0,
+                        help='Fake Gradle startup + configuration cost per invocation (default: 1.0)')
+    parser.add_argument('--tasks', default="clean=0.2,genSources=2,vscode=0.5,build=3",
+                        help='Fake Gradle task durations (default: clean=0.2,genSources=2,vscode=0.5,build=3)')
+    parser.add_argument('--repeat', type=int, default=3, help='Samples per scenario (default: 3)')
+    parser.add_argument('--minecraft-version', default="1.21.4", help='Target Minecraft version (default: 1.21.4)')
+    parser.add_argument('--mod-version', default="1.3.1", help='Target mod version (default: 1.3.1)')
+    parser.add_argument('--only', nargs='+', help='Only run scenarios whose name starts with one of these')
+    parser.add_argument('--json', type=Path, help='Write the results as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show the switcher output')
+    args = parser.parse_args()
+
+    if os.name == 'nt':
+        print("The benchmark's fake gradlew needs a POSIX shell; run it on Linux or macOS.")
+        sys.exit(1)
+
+    os.environ["FAKE_GRADLE_STARTUP"] = str(args.startup)
+    os.environ["FAKE_GRADLE_TASKS"] = args.tasks
+    os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+
+    server = MetadataStubServer(latency=args.latency).start()
+    workdir = Path(tempfile.mkdtemp(prefix="oxify-bench-"))
+    bench = Benchmark(server, workdir, args.minecraft_version, args.mod_version)
+    phases: Dict[str, List[float]] = {}
+
+    scenarios = {
+        "metadata-serial": lambda: bench.metadata(concurrent=False),
+        "metadata-concurrent": lambda: bench.metadata(concurrent=True),
+        "metadata-warm": bench.metadata_warm,
+        "gradle-multi": lambda: bench.gradle(pipeline=False),
+        "gradle-single": lambda: bench.gradle(pipeline=True),
+        "switch-serial-multi": lambda: bench.switch(False, False, {}),
+        "switch-concurrent-single": lambda: bench.switch(True, True, phases),
+    }
+    if args.only:
+        scenarios = {name: func for name, func in scenarios.items()
+                     if any(name.startswith(prefix) for prefix in args.only)}
+
+    print(f"Latency {args.latency}s per request, Gradle startup {args.startup}s, tasks {args.tasks}, "
+          f"{args.repeat} sample(s)\n")
+    print(f"{'Scenario':<26} {'median':>8} {'min':>8} {'max':>8}")
+    print("-" * 54)
+    results = {}
+    try:
+        for name, func in scenarios.items():
+            samples = measure(func, args.repeat, args.verbose)
+            results[name] = {"samples": samples, "median": statistics.median(samples)}
+            print(f"{name:<26} {statistics.median(samples):>7.2f}s {min(samples):>7.2f}s {max(samples):>7.2f}s")
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    for slow, fast in (("metadata-serial", "metadata-concurrent"),
+                       ("gradle-multi", "gradle-single"),
+                       ("switch-serial-multi", "switch-concurrent-single")):
+        if slow in results and fast in results:
+            print(f"{fast} vs {slow}: {results[slow]['median'] / results[fast]['median']:.2f}x faster")
+
+    if phases:
+        print(f"\nPer-phase breakdown of switch-concurrent-single (median):")
+        for name, durations in phases.items():
+            print(f"   {name:<40} {statistics.median(durations):>7.2f}s")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "settings": vars(args) | {"json": str(args.json)},
+            "results": results,
+            "phases": {name: statistics.median(durations) for name, durations in phases.items()},
+            "requests_served": server.requests_served,
+        }, indent=2) + "\n", encoding='utf-8')
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
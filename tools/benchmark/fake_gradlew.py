@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Fake gradlew used by the version switcher benchmarks.
+
+Mimics Gradle's plain console output without a JVM: every invocation pays a
+fixed startup/configuration cost, then each requested task sleeps for its
+configured duration and prints its "> Task :name" header. `build` drops a JAR
+named after mod_version into build/libs.
+
+Like Loom, an invocation holds an exclusive lock on the project
+(.gradle/loom-cache.lock) while its tasks run, so concurrent invocations on
+the same project wait for each other. A busy daemon cannot serve a second
+invocation either: that one pays the full startup of a fresh daemon.
+
+Environment:
+    FAKE_GRADLE_STARTUP   seconds of JVM startup + configuration per invocation (default: 1.0)
+    FAKE_GRADLE_TASKS     task durations, e.g. "clean=0.2,genSources=3,vscode=0.5,build=4"
+    FAKE_GRADLE_FAIL      comma separated tasks that fail
+    FAKE_GRADLE_BREAKING  versions from which `build` fails, e.g. "loom=1.10.3,fabric_version=0.125.0"
+                          (loom is read from build.gradle, anything else from gradle.properties)
+    FAKE_GRADLE_FAILURE_LOG  file whose content is printed when a task fails (e.g. recorded javac errors)
+    FAKE_GRADLE_WARM_STARTUP  if set, simulate a daemon: the first invocation without --no-daemon
+                          pays FAKE_GRADLE_STARTUP and leaves a marker file (FAKE_GRADLE_DAEMON),
+                          later ones only pay this (unless the daemon is busy with another
+                          invocation); --status reports it, --stop removes it
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: run without the project and daemon locks
+    fcntl = None
+
+DEFAULT_TASK_DURATIONS = {
+    "clean": 0.2,
+    "genSources": 3.0,
+    "vscode": 0.5,
+    "build": 4.0,
+}
+
+def parse_durations(value: str) -> dict:
+    durations = dict(DEFAULT_TASK_DURATIONS)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        task, _, seconds = item.partition("=")
+        durations[task] = float(seconds)
+    return durations
+
+def version_key(version: str) -> tuple:
+    return tuple(int(part) for part in re.findall(r'\d+', version.split("+")[0]))
+
+def project_version(project_root: Path, key: str) -> str:
+    if not (project_root / "build.gradle").exists():
+        return ""
+    if key == "loom":
+        match = re.search(r"id 'fabric-loom' version '([^']*)'",
+                          (project_root / "build.gradle").read_text(encoding='utf-8'))
+    else:
+        match = re.search(rf'^{key}=(.*)$', (project_root / "gradle.properties").read_text(encoding='utf-8'),
+                          re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+def breaking_versions(project_root: Path, value: str) -> list:
+    """Return the `key=version` rules of FAKE_GRADLE_BREAKING the project's versions reach"""
+    broken = []
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        key, _, version = item.partition("=")
+        if version_key(project_version(project_root, key)) >= version_key(version):
+            broken.append(item)
+    return broken
+
+def write_jar(project_root: Path):
+    properties = (project_root / "gradle.properties").read_text(encoding='utf-8')
+    match = re.search(r'^mod_version=(.*)$', properties, re.MULTILINE)
+    mod_version = match.group(1).strip() if match else "unknown"
+    build_libs = project_root / "build" / "libs"
+    build_libs.mkdir(parents=True, exist_ok=True)
+    (build_libs / f"oxify-{mod_version}.jar").write_bytes(b"PK\x05\x06" + b"\x00" * 18)
+
+def daemon_marker() -> Path:
+    return Path(os.environ.get("FAKE_GRADLE_DAEMON", Path(tempfile.gettempdir()) / "fake-gradle-daemon"))
+
+def try_lock(path: Path, blocking: bool):
+    """Open and flock `path`, returning the open file (the lock) or None if it is held elsewhere"""
+    if fcntl is None:
+        return None
+    handle = open(path, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+def startup_cost(args: list, held: list) -> float:
+    """Seconds of startup for this invocation; locks of the daemon it occupies are appended to `held`"""
+    startup = float(os.environ.get("FAKE_GRADLE_STARTUP", "1.0"))
+    warm_startup = os.environ.get("FAKE_GRADLE_WARM_STARTUP")
+    if warm_startup is None or "--no-daemon" in args:
+        return startup
+    if daemon_marker().exists():
+        busy_lock = try_lock(daemon_marker().with_suffix(".busy"), blocking=False)
+        if busy_lock is None and fcntl is not None:
+            # The daemon is running another build: Gradle spawns a fresh one
+            return startup
+        held.append(busy_lock)
+        return float(warm_startup)
+    daemon_marker().write_text(str(os.getpid()), encoding='utf-8')
+    held.append(try_lock(daemon_marker().with_suffix(".busy"), blocking=False))
+    return startup
+
+def main() -> int:
+    args = sys.argv[1:]
+    project_root = Path.cwd()
+    if "-p" in args:
+        # -p <dir> selects the project directory
+        position = args.index("-p")
+        project_root = Path(args[position + 1])
+        del args[position:position + 2]
+    if "--status" in args:
+        print("   PID STATUS   INFO")
+        if os.environ.get("FAKE_GRADLE_WARM_STARTUP") is not None and daemon_marker().exists():
+            print(f"{daemon_marker().read_text(encoding='utf-8'):>6} IDLE     8.12")
+        return 0
+    if "--stop" in args:
+        daemon_marker().unlink(missing_ok=True)
+        return 0
+    tasks = [arg for arg in args if not arg.startswith("-")]
+    keep_going = "--continue" in args
+    durations = parse_durations(os.environ.get("FAKE_GRADLE_TASKS", ""))
+    failing = set(filter(None, os.environ.get("FAKE_GRADLE_FAIL", "").split(",")))
+    if breaking_versions(project_root, os.environ.get("FAKE_GRADLE_BREAKING", "")):
+        failing.add("build")
+
+    start = time.perf_counter()
+    held = []
+    time.sleep(startup_cost(args, held))
+    if tasks:
+        (project_root / ".gradle").mkdir(parents=True, exist_ok=True)
+        held.append(try_lock(project_root / ".gradle" / "loom-cache.lock", blocking=True))
+
+    failed = []
+    for task in tasks:
+        time.sleep(durations.get(task, 0.1))
+        if task in failing:
+            print(f"> Task :{task} FAILED", flush=True)
+            failed.append(task)
+            if not keep_going:
+                break
+            continue
+        print(f"> Task :{task}", flush=True)
+        if task == "clean":
+            for jar in (project_root / "build" / "libs").glob("*.jar"):
+                jar.unlink()
+        elif task == "build":
+            write_jar(project_root)
+
+    elapsed = time.perf_counter() - start
+    if failed:
+        failure_log = os.environ.get("FAKE_GRADLE_FAILURE_LOG")
+        if failure_log:
+            print(Path(failure_log).read_text(encoding='utf-8'), flush=True)
+        print("\nFAILURE: Build failed with an exception.\n")
+        for task in failed:
+            print("* What went wrong:")
+            print(f"Execution failed for task ':{task}'.\n")
+        print(f"BUILD FAILED in {elapsed:.0f}s", flush=True)
+        return 1
+    print(f"\nBUILD SUCCESSFUL in {elapsed:.0f}s", flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the metadata servers used by the version switcher.
+
+Serves the recorded Fabric Meta, Fabric Maven and GitHub responses in
+fixtures/ with a configurable per-request latency, and answers conditional
+requests with 304 so cache revalidation can be measured too.
+
+    /fabric-meta/<path>   ->  fixtures/fabric-meta/<path>[.json]
+    /fabric-maven/<path>  ->  fixtures/fabric-maven/<path>
+    /github/<path>        ->  fixtures/github/<path>[.json]
+
+Usage:
+    python stub_server.py --port 8765 --latency 0.25
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+CONTENT_TYPES = {
+    ".json": "application/json",
+    ".xml": "application/xml",
+}
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: "MetadataStubServer"
+
+    def do_GET(self):
+        self.server.record_request()
+        time.sleep(self.server.latency)
+
+        fixture = self.server.resolve(self.path.split("?", 1)[0])
+        if fixture is None:
+            self.send_error(404)
+            return
+
+        body = fixture.read_bytes()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES.get(fixture.suffix, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+class MetadataStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server serving recorded metadata fixtures with artificial latency"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, fixtures_dir: Path = FIXTURES_DIR):
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        self.latency = latency
+        self.fixtures_dir = fixtures_dir.resolve()
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def fabric_meta_url(self) -> str:
+        return f"{self.base_url}/fabric-meta"
+
+    @property
+    def github_api_url(self) -> str:
+        return f"{self.base_url}/github"
+
+    @property
+    def fabric_maven_url(self) -> str:
+        return f"{self.base_url}/fabric-maven"
+
+    def record_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def resolve(self, url_path: str) -> Optional[Path]:
+        """Map a request path to its fixture file"""
+        relative = url_path.strip("/")
+        for candidate in (self.fixtures_dir / relative, self.fixtures_dir / f"{relative}.json"):
+            candidate = candidate.resolve()
+            # Never serve anything outside the fixtures directory
+            if candidate.is_file() and self.fixtures_dir in candidate.parents:
+                return candidate
+        return None
+
+    def start(self) -> "MetadataStubServer":
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name="metadata-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded Fabric Meta, Fabric Maven and GitHub responses locally")
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before each response')
+    args = parser.parse_args()
+
+    server = MetadataStubServer(args.port, args.latency)
+    print(f"Serving fixtures from {server.fixtures_dir}")
+    print(f"  OXIFY_FABRIC_META_URL={server.fabric_meta_url}")
+    print(f"  OXIFY_GITHUB_API_URL={server.github_api_url}")
+    print(f"  OXIFY_FABRIC_MAVEN_URL={server.fabric_maven_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
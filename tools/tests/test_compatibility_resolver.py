@@ -0,0 +1,88 @@
+"""Tests for version ordering and the dependency compatibility resolver"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import CompatibilityResolver, newest, parse_version  # noqa: E402
+
+YARN = ["1.21.5+build.9", "1.21.5+build.10", "1.21.5+build.2"]
+LOADERS = ["0.16.9", "0.16.14", "0.16.10"]
+FABRIC_API = ["0.128.1+1.21.5", "0.119.2+1.21.4", "0.127.0+1.21.5"]
+LOOMS = ["1.9.2", "1.10.1", "1.10.5", "1.11.2", "1.11-SNAPSHOT"]
+
+def ordered(*versions: str) -> list:
+    return sorted(versions, key=parse_version)
+
+class VersionOrderingTest(unittest.TestCase):
+    def test_release_components_compare_numerically(self):
+        self.assertEqual(ordered("1.10", "1.9.2", "1.2"), ["1.2", "1.9.2", "1.10"])
+        self.assertEqual(parse_version("1.21.0"), parse_version("1.21"))
+
+    def test_pre_release_sorts_before_release(self):
+        self.assertEqual(ordered("1.10", "1.10-SNAPSHOT", "8.14-rc-1"), ["1.10-SNAPSHOT", "1.10", "8.14-rc-1"])
+        self.assertLess(parse_version("8.14-rc-1"), parse_version("8.14"))
+        self.assertLess(parse_version("1.0-alpha"), parse_version("1.0-beta"))
+
+    def test_numbered_pre_releases_compare_numerically(self):
+        self.assertEqual(ordered("1.21-pre10", "1.21-pre9", "1.21-rc1", "1.21"),
+                         ["1.21-pre9", "1.21-pre10", "1.21-rc1", "1.21"])
+        self.assertLess(parse_version("8.14-rc-2"), parse_version("8.14-rc-10"))
+
+    def test_build_suffix_breaks_ties(self):
+        self.assertEqual(newest(YARN), "1.21.5+build.10")
+        self.assertEqual(parse_version("0.128.1+1.21.5").minecraft_version, "1.21.5")
+        self.assertIsNone(parse_version("1.21.5+build.10").minecraft_version)
+
+class CompatibilityResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.resolver = CompatibilityResolver()
+
+    def resolve(self, wrapper_gradle, latest_gradle="8.14.3", current_loom="1.9.2", minecraft="1.21.5"):
+        return self.resolver.resolve(minecraft, YARN, LOADERS, FABRIC_API, LOOMS,
+                                     wrapper_gradle=wrapper_gradle, latest_gradle=latest_gradle,
+                                     current_loom=current_loom)
+
+    def test_newest_compatible_versions(self):
+        resolution = self.resolve("8.14.3")
+        self.assertEqual((resolution["yarn_mappings"], resolution["loader_version"], resolution["fabric_version"],
+                          resolution["loom_version"], resolution["gradle_version"], resolution["java_version"]),
+                         ("1.21.5+build.10", "0.16.14", "0.128.1+1.21.5", "1.11.2", "8.14.3", 21))
+        self.assertEqual((resolution["notes"], resolution["held_back"]), ([], {}))
+
+    def test_newer_loom_needing_newer_gradle_is_held_back(self):
+        resolution = self.resolve("8.12")
+        self.assertEqual(resolution["loom_version"], "1.10.5")
+        self.assertEqual(resolution["gradle_version"], "8.12")
+        self.assertEqual(resolution["held_back"], {"loom_version": "1.11.2"})
+
+    def test_no_loom_fits_the_wrapper_keeps_current_loom(self):
+        resolution = self.resolve("8.10")
+        self.assertEqual(resolution["loom_version"], "1.9.2")
+        # The wrapper is not changed, the needed Gradle is only suggested
+        self.assertEqual(resolution["gradle_version"], "8.10")
+        self.assertEqual(resolution["held_back"], {"loom_version": "1.11.2"})
+        self.assertEqual(len(resolution["notes"]), 1)
+        self.assertIn("update gradle-wrapper.properties to 8.14.3", resolution["notes"][0])
+        self.assertIn("keeping Fabric Loom 1.9.2", resolution["notes"][0])
+
+    def test_loom_too_old_for_minecraft_is_reported(self):
+        resolution = self.resolver.resolve("1.21.5", YARN, LOADERS, FABRIC_API, ["1.9.2"],
+                                           wrapper_gradle="8.14.3", latest_gradle="8.14.3")
+        self.assertIsNone(resolution["loom_version"])
+        self.assertIn("needs 1.10+", resolution["notes"][0])
+
+    def test_fabric_api_falls_back_to_newest_listed_build(self):
+        resolution = self.resolve("8.14.3", minecraft="1.21.6")
+        self.assertEqual(resolution["fabric_version"], "0.128.1+1.21.5")
+        self.assertIn("No Fabric API build is tagged +1.21.6", resolution["notes"][0])
+
+    def test_missing_candidates_resolve_to_none(self):
+        resolution = self.resolver.resolve("1.21.5", [], [], [], [], wrapper_gradle=None, latest_gradle=None)
+        self.assertEqual([resolution[key] for key in ("yarn_mappings", "loader_version", "fabric_version",
+                                                      "loom_version", "gradle_version")], [None] * 5)
+
+if __name__ == "__main__":
+    unittest.main()
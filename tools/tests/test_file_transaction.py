@@ -0,0 +1,129 @@
+"""Tests for the all-or-nothing project file updates"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import version_switcher  # noqa: E402
+from version_switcher import JOURNAL_NAME, FileTransaction  # noqa: E402
+
+ORIGINAL = {
+    "gradle.properties": b"minecraft_version=1.21.4\r\n",
+    "build.gradle": b"id 'fabric-loom' version '1.9.2'\n",
+}
+UPDATED = {
+    "gradle.properties": b"minecraft_version=1.21.5\r\n",
+    "build.gradle": b"id 'fabric-loom' version '1.10.1'\n",
+    "gradle/wrapper/gradle-wrapper.properties": b"distributionUrl=gradle-8.12-bin.zip\n",
+}
+
+class Killed(BaseException):
+    """Stands in for the process dying: commit() only cleans up after Exception"""
+
+class FileTransactionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        for name, data in ORIGINAL.items():
+            (self.root / name).write_bytes(data)
+        (self.root / "gradle" / "wrapper").mkdir(parents=True)
+    
+    def files(self) -> dict:
+        return {path.relative_to(self.root).as_posix(): path.read_bytes()
+                for path in self.root.rglob("*") if path.is_file()}
+    
+    def staged(self) -> FileTransaction:
+        transaction = FileTransaction(self.root)
+        for name, data in UPDATED.items():
+            transaction.stage(self.root / name, data)
+        return transaction
+    
+    def fail_on_rename(self, target: str, error: BaseException):
+        """Patch os.replace to raise the first time a file is renamed onto target"""
+        replace = os.replace
+        failed = []
+        
+        def patched(src, dst):
+            if Path(dst) == self.root / target and not failed:
+                failed.append(dst)
+                raise error
+            return replace(src, dst)
+        return mock.patch("os.replace", side_effect=patched)
+    
+    def test_commit_writes_only_changed_files(self):
+        transaction = self.staged()
+        transaction.stage(self.root / "build.gradle", ORIGINAL["build.gradle"])
+        written = transaction.commit()
+        self.assertEqual(sorted(path.name for path in written), ["gradle-wrapper.properties", "gradle.properties"])
+        self.assertEqual(self.files(), {**ORIGINAL, **{name: data for name, data in UPDATED.items()
+                                                      if name != "build.gradle"}})
+    
+    def test_failed_rename_rolls_back(self):
+        with self.fail_on_rename("build.gradle", OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.staged().commit()
+        self.assertEqual(self.files(), ORIGINAL)
+    
+    def test_interrupted_commit_can_be_completed(self):
+        with self.fail_on_rename("build.gradle", Killed()):
+            with self.assertRaises(Killed):
+                self.staged().commit()
+        transaction = FileTransaction(self.root)
+        self.assertEqual(transaction.pending()["state"], "committing")
+        transaction.complete()
+        self.assertEqual(self.files(), UPDATED)
+    
+    def test_interrupted_commit_can_be_rolled_back(self):
+        with self.fail_on_rename("build.gradle", Killed()):
+            with self.assertRaises(Killed):
+                self.staged().commit()
+        FileTransaction(self.root).rollback()
+        self.assertEqual(self.files(), ORIGINAL)
+    
+    def test_interrupted_staging_is_cleaned_up(self):
+        write_synced = version_switcher._write_synced
+        
+        def partial_write(path, data):
+            if path.name.endswith(".oxify-new") and "build" in path.name:
+                path.write_bytes(data[:5])
+                raise Killed()
+            write_synced(path, data)
+        with mock.patch.object(version_switcher, "_write_synced", side_effect=partial_write):
+            with self.assertRaises(Killed):
+                self.staged().commit()
+        transaction = FileTransaction(self.root)
+        self.assertEqual(transaction.pending()["state"], "staging")
+        self.assertEqual(transaction.complete(), [])
+        self.assertEqual(self.files(), ORIGINAL)
+    
+    def test_interrupted_journal_write_leaves_files_untouched(self):
+        write_synced = version_switcher._write_synced
+        
+        def partial_journal(path, data):
+            if path.name.startswith(JOURNAL_NAME):
+                path.write_bytes(data[:10])
+                raise Killed()
+            write_synced(path, data)
+        with mock.patch.object(version_switcher, "_write_synced", side_effect=partial_journal):
+            with self.assertRaises(Killed):
+                self.staged().commit()
+        self.assertIsNone(FileTransaction(self.root).pending())
+        self.assertFalse((self.root / JOURNAL_NAME).exists())
+        self.assertEqual({name: data for name, data in self.files().items() if not name.startswith(JOURNAL_NAME)},
+                         ORIGINAL)
+    
+    def test_unreadable_journal_recovers_nothing(self):
+        (self.root / JOURNAL_NAME).write_text('{"files": [', encoding='utf-8')
+        transaction = FileTransaction(self.root)
+        self.assertEqual(transaction.pending()["files"], [])
+        self.assertEqual(transaction.rollback(), [])
+        self.assertEqual(self.files(), ORIGINAL)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Tests for the streaming Gradle failure classification"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import GradleLogAnalyzer  # noqa: E402
+
+SOURCE = "/work/src/main/java/com/codinn/oxify"
+
+COMPILE_LOG = f"""> Task :compileJava
+{SOURCE}/item/custom/OxidizerItem.java:3: error: cannot find symbol
+import net.minecraft.item.ItemUsageContext;
+                         ^
+  symbol:   class ItemUsageContext
+  location: package net.minecraft.item
+{SOURCE}/OxifyItems.java:14: error: method register in class Registry<T> cannot be applied to given types;
+        return Registry.register(Registries.ITEM, id, item);
+                       ^
+  required: Registry<V>,RegistryKey<V>,T
+  found:    DefaultedRegistry<Item>,Identifier,Item
+  reason: cannot infer type-variable(s)
+{SOURCE}/OxifyItems.java:14: error: method register in class Registry<T> cannot be applied to given types;
+2 errors
+> Task :compileJava FAILED
+"""
+
+def analyze(log: str) -> GradleLogAnalyzer:
+    analyzer = GradleLogAnalyzer()
+    for line in log.splitlines():
+        analyzer.feed(line)
+    return analyzer
+
+class GradleLogAnalyzerTest(unittest.TestCase):
+    def test_compile_errors_keep_javac_details(self):
+        failures = list(analyze(COMPILE_LOG).failures.values())
+        self.assertEqual([(Path(failure.file).name, failure.line, failure.count) for failure in failures],
+                         [("OxidizerItem.java", 3, 1), ("OxifyItems.java", 14, 2)])
+        # The unindented import excerpt must not cut off the symbol/location lines
+        self.assertEqual(failures[0].details, {"symbol": "class ItemUsageContext",
+                                               "location": "package net.minecraft.item"})
+        self.assertEqual(failures[1].details["found"], "DefaultedRegistry<Item>,Identifier,Item")
+        self.assertEqual(analyze(COMPILE_LOG).decision(), "fix-code")
+    
+    def test_coordinates_exclude_the_sentence_period(self):
+        analyzer = analyze("> Could not resolve net.fabricmc:fabric-loader:0.99.0.\n"
+                           "   > Could not find net.fabricmc:fabric-loader:0.99.0.\n"
+                           "> Could not find net.fabricmc:yarn:1.21.9+build.1:v2.\n")
+        failures = list(analyzer.failures.values())
+        self.assertEqual([failure.details["coordinates"] for failure in failures],
+                         ["net.fabricmc:fabric-loader:0.99.0", "net.fabricmc:yarn:1.21.9+build.1:v2"])
+        self.assertEqual(failures[0].count, 2)
+        self.assertEqual(analyzer.decision(), "rollback")
+    
+    def test_missing_plugin(self):
+        analyzer = analyze("Plugin [id: 'fabric-loom', version: '9.9.9'] was not found in any of the following sources:")
+        (failure,) = analyzer.failures.values()
+        self.assertEqual((failure.category, failure.details), ("unresolved", {"plugin": "fabric-loom",
+                                                                              "version": "9.9.9"}))
+    
+    def test_network_problems_are_retried_first(self):
+        analyzer = analyze("> Could not GET 'https://maven.fabricmc.net/net/fabricmc/yarn/maven-metadata.xml'.\n"
+                           "> Could not resolve net.fabricmc:yarn:1.21.5+build.1.\n")
+        self.assertEqual(analyzer.categories(), {"network", "unresolved"})
+        self.assertEqual(analyzer.decision(), "retry")
+    
+    def test_timeouts_alone_are_retried(self):
+        analyzer = GradleLogAnalyzer()
+        analyzer.add("timeout", "build exceeded 600s")
+        self.assertEqual(analyzer.decision(), "retry")
+    
+    def test_mixin_and_mappings(self):
+        analyzer = analyze("Mixin apply failed oxify.mixins.json:ExampleMixin -> net.minecraft.server.MinecraftServer\n")
+        self.assertEqual(analyzer.decision(), "fix-code")
+        analyzer.feed("Failed to remap net.fabricmc.fabric-api:fabric-api:0.128.1+1.21.5")
+        self.assertEqual(analyzer.decision(), "rollback")
+    
+    def test_unrecognized_output(self):
+        analyzer = analyze("BUILD FAILED in 3s\n* What went wrong:\nSomething unexpected\n")
+        self.assertEqual(analyzer.failures, {})
+        self.assertEqual(analyzer.decision(), "none")
+
+if __name__ == "__main__":
+    unittest.main()
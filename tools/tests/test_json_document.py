@@ -0,0 +1,94 @@
+"""Tests for the span-preserving fabric.mod.json editing"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import JsonDocument, MetadataCache, VersionSwitcher  # noqa: E402
+
+MOD_JSON = """{
+  "schemaVersion": 1,
+  "id": "oxify",
+  "depends": {
+    "fabricloader": ">=0.16.10",
+    "minecraft": "~1.21.5",
+    "java": ">=21",
+    "fabric-api": "*"
+  },
+  "custom": {}
+}
+"""
+
+class JsonDocumentTest(unittest.TestCase):
+    def test_unchanged_values_keep_the_text(self):
+        document = JsonDocument(MOD_JSON)
+        self.assertFalse(document.set(("depends", "minecraft"), "~1.21.5"))
+        self.assertEqual(document.text, MOD_JSON)
+    
+    def test_only_the_value_span_changes(self):
+        document = JsonDocument(MOD_JSON)
+        self.assertTrue(document.set(("depends", "minecraft"), "~1.21.6"))
+        self.assertEqual(document.text, MOD_JSON.replace('"~1.21.5"', '"~1.21.6"'))
+    
+    def test_insert_uses_the_sibling_indent(self):
+        document = JsonDocument(MOD_JSON)
+        document.set(("depends", "cloth-config"), ">=15")
+        self.assertIn('"fabric-api": "*",\n    "cloth-config": ">=15"\n  }', document.text)
+        self.assertEqual(document.data["depends"]["cloth-config"], ">=15")
+    
+    def test_insert_into_empty_object(self):
+        document = JsonDocument(MOD_JSON)
+        document.set(("custom", "modmenu"), {"badges": []})
+        self.assertEqual(document.data["custom"], {"modmenu": {"badges": []}})
+        self.assertIn('"custom": {"modmenu": {"badges": []}}', document.text)
+    
+    def test_crlf_text_keeps_crlf(self):
+        text = MOD_JSON.replace("\n", "\r\n")
+        document = JsonDocument(text)
+        self.assertFalse(document.set(("depends", "java"), ">=21"))
+        self.assertEqual(document.text, text)
+        document.set(("depends", "cloth-config"), ">=15")
+        self.assertNotIn("\n", document.text.replace("\r\n", ""))
+    
+    def test_escapes_and_nested_arrays(self):
+        text = '{"a": ["x", {"b": "q\\"uote"}], "c": -1.5e3, "d": null}'
+        document = JsonDocument(text)
+        self.assertFalse(document.set(("c",), -1500.0))
+        document.set(("d",), True)
+        self.assertEqual(document.text, '{"a": ["x", {"b": "q\\"uote"}], "c": -1.5e3, "d": true}')
+
+class FabricModJsonUpdateTest(unittest.TestCase):
+    def update(self, content: bytes, minecraft_version: str) -> bytes:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        project = Path(tmp.name)
+        path = project / "src" / "main" / "resources" / "fabric.mod.json"
+        path.parent.mkdir(parents=True)
+        path.write_bytes(content)
+        switcher = VersionSwitcher(project, MetadataCache(project / "cache", "offline"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            switcher.update_fabric_mod_json(minecraft_version, {"loader_version": "0.16.10",
+                                                                "fabric_version": "0.128.1+1.21.5",
+                                                                "java_version": "21"})
+        return path.read_bytes()
+    
+    def test_unchanged_crlf_file_is_byte_identical(self):
+        content = MOD_JSON.replace("\n", "\r\n").encode('utf-8')
+        self.assertEqual(self.update(content, "1.21.5"), content)
+    
+    def test_unchanged_lf_file_is_byte_identical(self):
+        content = MOD_JSON.encode('utf-8')
+        self.assertEqual(self.update(content, "1.21.5"), content)
+    
+    def test_changed_crlf_file_stays_crlf(self):
+        content = MOD_JSON.replace("\n", "\r\n").encode('utf-8')
+        expected = content.replace(b"~1.21.5", b"~1.21.6")
+        self.assertEqual(self.update(content, "1.21.6"), expected)
+
+if __name__ == "__main__":
+    unittest.main()
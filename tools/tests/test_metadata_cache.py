@@ -0,0 +1,91 @@
+"""Tests for the on-disk metadata cache and its revalidation"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import MetadataCache  # noqa: E402
+
+URL = "https://meta.fabricmc.net/v2/versions"
+
+class FakeServer:
+    """Answers like an HTTP server with an ETag, recording the request headers"""
+
+    def __init__(self, body: bytes = b'{"game": []}', etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.status = None
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        if self.status is not None:
+            return SimpleNamespace(status_code=self.status, content=b"", headers={})
+        if headers and headers.get("If-None-Match") == self.etag:
+            return SimpleNamespace(status_code=304, content=b"", headers={})
+        return SimpleNamespace(status_code=200, content=self.body, headers={"ETag": self.etag})
+
+class MetadataCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        self.server = FakeServer()
+
+    def test_fresh_entry_is_served_from_disk(self):
+        cache = MetadataCache(self.cache_dir)
+        self.assertEqual(cache.fetch(URL, 3600, self.server.get), self.server.body)
+        self.assertEqual(cache.fetch(URL, 3600, self.server.get), self.server.body)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(cache.stats, {"hits": 1, "revalidated": 0, "misses": 1})
+
+    def test_expired_entry_is_revalidated_with_its_etag(self):
+        cache = MetadataCache(self.cache_dir)
+        cache.fetch(URL, 3600, self.server.get)
+        fetched_at = cache.load(URL)["fetched_at"]
+        self.assertEqual(cache.fetch(URL, 0, self.server.get), self.server.body)
+        self.assertEqual(self.server.requests[-1], {"If-None-Match": '"v1"'})
+        self.assertEqual(cache.stats["revalidated"], 1)
+        # A 304 restarts the TTL
+        self.assertGreaterEqual(cache.load(URL)["fetched_at"], fetched_at)
+
+    def test_expired_entry_is_replaced_when_changed(self):
+        cache = MetadataCache(self.cache_dir)
+        cache.fetch(URL, 3600, self.server.get)
+        self.server.body, self.server.etag = b'{"game": [1]}', '"v2"'
+        self.assertEqual(cache.fetch(URL, 0, self.server.get), b'{"game": [1]}')
+        self.assertEqual(cache.load(URL)["etag"], '"v2"')
+        self.assertEqual(cache.stats["misses"], 2)
+
+    def test_refresh_mode_ignores_the_ttl(self):
+        MetadataCache(self.cache_dir).fetch(URL, 3600, self.server.get)
+        cache = MetadataCache(self.cache_dir, "refresh")
+        cache.fetch(URL, 3600, self.server.get)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(cache.stats["revalidated"], 1)
+
+    def test_server_error_returns_none_and_keeps_the_entry(self):
+        cache = MetadataCache(self.cache_dir)
+        cache.fetch(URL, 3600, self.server.get)
+        self.server.status = 503
+        self.assertIsNone(cache.fetch(URL, 0, self.server.get))
+        self.assertEqual(cache.load(URL)["body"], self.server.body)
+
+    def test_offline_mode_never_touches_the_network(self):
+        MetadataCache(self.cache_dir).fetch(URL, 3600, self.server.get)
+        cache = MetadataCache(self.cache_dir, "offline")
+        self.assertEqual(cache.fetch(URL, 0, self.server.get), self.server.body)
+        with self.assertRaises(RuntimeError):
+            cache.fetch(URL + "/missing", 0, self.server.get)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MetadataCache(self.cache_dir, "sometimes")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the gradle.properties line model"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import PropertiesFile  # noqa: E402
+
+GRADLE_PROPERTIES = """# Done to increase the memory available to gradle.
+org.gradle.jvmargs=-Xmx1G
+org.gradle.parallel=true
+
+# Fabric Properties
+minecraft_version=1.21.4
+yarn_mappings=1.21.4+build.8
+loader_version=0.16.10
+
+# Mod Properties
+mod_version = 1.21.4-1.3.1
+fabric_version: 0.119.2+1.21.4
+"""
+
+class PropertiesFileTest(unittest.TestCase):
+    def test_round_trip_without_edits(self):
+        properties = PropertiesFile(GRADLE_PROPERTIES)
+        report = properties.update({"minecraft_version": "1.21.4", "mod_version": "1.21.4-1.3.1"})
+        self.assertEqual(report["changed"], [])
+        self.assertEqual(properties.text, GRADLE_PROPERTIES)
+    
+    def test_separators_and_comments_are_kept(self):
+        properties = PropertiesFile(GRADLE_PROPERTIES)
+        properties.update({"minecraft_version": "1.21.5", "mod_version": "1.21.5-1.3.1",
+                           "fabric_version": "0.128.1+1.21.5"})
+        expected = (GRADLE_PROPERTIES.replace("minecraft_version=1.21.4", "minecraft_version=1.21.5")
+                    .replace("mod_version = 1.21.4-1.3.1", "mod_version = 1.21.5-1.3.1")
+                    .replace("fabric_version: 0.119.2+1.21.4", "fabric_version: 0.128.1+1.21.5"))
+        self.assertEqual(properties.text, expected)
+    
+    def test_missing_keys_are_reported_or_appended(self):
+        properties = PropertiesFile(GRADLE_PROPERTIES)
+        report = properties.update({"loom_version": "1.10.1"})
+        self.assertEqual(report["missing"], ["loom_version"])
+        report = properties.update({"loom_version": "1.10.1", "java_version": "21"}, add_missing=True)
+        self.assertEqual(report["added"], ["loom_version", "java_version"])
+        self.assertTrue(properties.text.endswith("fabric_version: 0.119.2+1.21.4\nloom_version=1.10.1\n"
+                                                 "java_version=21\n"))
+        self.assertEqual(properties.get("java_version"), "21")
+    
+    def test_last_definition_wins(self):
+        properties = PropertiesFile("mod_version=1\nmod_version=2\n")
+        self.assertEqual(properties.get("mod_version"), "2")
+        properties.update({"mod_version": "3"})
+        self.assertEqual(properties.text, "mod_version=1\nmod_version=3\n")
+    
+    def test_continuation_lines(self):
+        properties = PropertiesFile("org.gradle.jvmargs=-Xmx1G \\\n    -Dfile.encoding=UTF-8\nmod_version=1\n")
+        self.assertEqual(properties.get("org.gradle.jvmargs"), "-Xmx1G -Dfile.encoding=UTF-8")
+        self.assertEqual(properties.get("mod_version"), "1")
+        properties.update({"org.gradle.jvmargs": "-Xmx2G", "mod_version": "2"})
+        self.assertEqual(properties.text, "org.gradle.jvmargs=-Xmx2G\nmod_version=2\n")
+    
+    def test_escaped_backslash_does_not_continue(self):
+        properties = PropertiesFile("path=C:\\\\\nmod_version=1\n")
+        self.assertEqual(properties.get("mod_version"), "1")
+    
+    def test_comment_ending_in_backslash_does_not_continue(self):
+        properties = PropertiesFile("# see C:\\path\\\nminecraft_version=1.21.5\n")
+        self.assertEqual(properties.get("minecraft_version"), "1.21.5")
+        report = properties.update({"minecraft_version": "1.21.6"}, add_missing=True)
+        self.assertEqual(report, {"changed": ["minecraft_version"], "added": [], "missing": []})
+        self.assertEqual(properties.text, "# see C:\\path\\\nminecraft_version=1.21.6\n")
+    
+    def test_continuation_at_end_of_file(self):
+        properties = PropertiesFile("mod_version=1\nargs=a \\\n  b \\")
+        properties.update({"args": "c"})
+        self.assertEqual(properties.text, "mod_version=1\nargs=c")
+
+if __name__ == "__main__":
+    unittest.main()
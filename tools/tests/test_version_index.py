@@ -0,0 +1,106 @@
+"""Tests for the Fabric Meta document index and the local version index"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import FabricMetaIndex, VersionIndex  # noqa: E402
+
+DOCUMENT = {
+    "game": [{"version": "1.21.5", "stable": True}, {"version": "25w14a", "stable": False},
+             {"version": "1.21.4", "stable": True}],
+    "mappings": [{"gameVersion": "1.21.5", "version": "1.21.5+build.1", "build": 1},
+                 {"gameVersion": "1.21.5", "version": "1.21.5+build.10", "build": 10},
+                 {"gameVersion": "1.21.4", "version": "1.21.4+build.8", "build": 8}],
+    "intermediary": [{"version": "1.21.5", "maven": "net.fabricmc:intermediary:1.21.5"}],
+    "loader": [{"version": "0.16.14", "stable": True}, {"version": "0.17.0-beta.1", "stable": False},
+               {"version": "0.16.9", "stable": True}],
+}
+
+class FakeSwitcher:
+    """The metadata lookups VersionIndex.update uses, answered from memory"""
+
+    def __init__(self, fabric_api):
+        self.meta = FabricMetaIndex(DOCUMENT)
+        self.fabric_api = fabric_api
+        self.fetched = []
+
+    def get_meta_index(self):
+        return self.meta
+
+    def get_fabric_api_versions(self, minecraft_version):
+        self.fetched.append(minecraft_version)
+        versions = self.fabric_api[minecraft_version]
+        if isinstance(versions, Exception):
+            raise versions
+        return versions
+
+    def get_fabric_loom_versions(self):
+        return ["1.10.5", "1.11.2"]
+
+    def get_latest_gradle_version(self):
+        return "8.14.3"
+
+class FabricMetaIndexTest(unittest.TestCase):
+    def test_queries(self):
+        meta = FabricMetaIndex(DOCUMENT)
+        self.assertEqual(meta.yarn_versions("1.21.5"), ["1.21.5+build.10", "1.21.5+build.1"])
+        self.assertEqual(meta.latest_yarn("1.21.5"), "1.21.5+build.10")
+        self.assertEqual(meta.yarn_versions("1.7.10"), [])
+        self.assertEqual(meta.intermediary("1.21.5"), "net.fabricmc:intermediary:1.21.5")
+        self.assertIsNone(meta.intermediary("1.21.4"))
+        self.assertEqual(meta.loader_versions(), ["0.16.14", "0.16.9"])
+        self.assertEqual(meta.latest_loader(stable_only=False), "0.17.0-beta.1")
+        self.assertEqual(meta.stable_game_versions, ["1.21.5", "1.21.4"])
+
+class VersionIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "index.json"
+
+    def test_full_update_and_round_trip(self):
+        switcher = FakeSwitcher({"1.21.5": ["0.128.1+1.21.5"], "1.21.4": ["0.119.2+1.21.4"]})
+        index = VersionIndex()
+        stats = index.update(switcher, full=True, jobs=2)
+        self.assertEqual(stats, {"minecraft_versions": 2, "fabric_api_fetched": 2, "fabric_api_failed": 0})
+        index.save(self.path)
+        loaded = VersionIndex.load(self.path)
+        self.assertEqual(loaded.yarn_versions("1.21.5"), ["1.21.5+build.10", "1.21.5+build.1"])
+        self.assertEqual(loaded.fabric_api_versions("1.21.4"), ["0.119.2+1.21.4"])
+        self.assertEqual((loaded.latest_loader(), loaded.latest_loom(), loaded.gradle_version()),
+                         ("0.16.14", "1.11.2", "8.14.3"))
+
+    def test_update_only_fetches_new_and_recent_versions(self):
+        index = VersionIndex()
+        index.update(FakeSwitcher({"1.21.5": ["0.128.1+1.21.5"], "1.21.4": ["0.119.2+1.21.4"]}), full=True)
+        switcher = FakeSwitcher({"1.21.5": ["0.128.2+1.21.5"]})
+        index.update(switcher, recent=1)
+        self.assertEqual(switcher.fetched, ["1.21.5"])
+        self.assertEqual(index.fabric_api_versions("1.21.5"), ["0.128.2+1.21.5"])
+        self.assertEqual(index.fabric_api_versions("1.21.4"), ["0.119.2+1.21.4"])
+
+    def test_failed_fetch_keeps_the_stored_list(self):
+        index = VersionIndex()
+        index.update(FakeSwitcher({"1.21.5": ["0.128.1+1.21.5"], "1.21.4": ["0.119.2+1.21.4"]}), full=True)
+        stats = index.update(FakeSwitcher({"1.21.5": RuntimeError("503"), "1.21.4": ["0.119.3+1.21.4"]}),
+                             full=True)
+        self.assertEqual((stats["fabric_api_fetched"], stats["fabric_api_failed"]), (1, 1))
+        self.assertEqual(index.fabric_api_versions("1.21.5"), ["0.128.1+1.21.5"])
+        self.assertEqual(index.fabric_api_versions("1.21.4"), ["0.119.3+1.21.4"])
+
+    def test_empty_list_from_the_server_is_stored(self):
+        index = VersionIndex()
+        index.update(FakeSwitcher({"1.21.5": ["0.128.1+1.21.5"], "1.21.4": []}), full=True)
+        self.assertEqual(index.fabric_api_versions("1.21.4"), [])
+
+    def test_unsupported_format_is_rejected(self):
+        self.path.write_text('{"format": 0}', encoding='utf-8')
+        with self.assertRaises(ValueError):
+            VersionIndex.load(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
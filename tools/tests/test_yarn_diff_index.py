@@ -0,0 +1,161 @@
+"""Tests for the yarn mapping diff and its memory-mapped index"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from version_switcher import (YARN_MAPPINGS_ENTRY, GradleFailure, MetadataCache, VersionSwitcher,  # noqa: E402
+                              YarnDiff, YarnDiffIndex, YarnMappings, javac_symbol)
+
+HEADER = "tiny\t2\t0\tofficial\tintermediary\tnamed\n"
+
+OLD_MAPPINGS = HEADER + """c\ta\tnet/minecraft/class_1\tnet/minecraft/item/Item
+\tm\t(Lb;)V\tc\tmethod_1\tuseOnBlock
+\tm\t()Ljava/lang/String;\td\tmethod_2\tgetName
+\tf\tI\te\tfield_1\tcount
+c\tb\tnet/minecraft/class_2\tnet/minecraft/item/ItemUsageContext
+c\tf\tnet/minecraft/class_3\tnet/minecraft/util/Foo
+c\tg\tnet/minecraft/class_4\tnet/minecraft/util/Gone
+"""
+
+NEW_MAPPINGS = HEADER + """c\ta\tnet/minecraft/class_1\tnet/minecraft/item/Item
+\tm\t(Lb;)V\tc\tmethod_1\tuseOnBlockAt
+\tm\t(I)Ljava/lang/String;\td\tmethod_2\tgetName
+\tf\tI\te\tfield_1\tcount
+c\tb\tnet/minecraft/class_2\tnet/minecraft/item/context/ItemUsageContext
+c\tf\tnet/minecraft/class_3\tnet/minecraft/util/Bar
+"""
+
+def write_jar(path: Path, mappings: str) -> Path:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(YARN_MAPPINGS_ENTRY, mappings)
+    return path
+
+class YarnDiffIndexTest(unittest.TestCase):
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.root = Path(temp.name)
+        self.diff = YarnDiff(YarnMappings(write_jar(self.root / "old.jar", OLD_MAPPINGS)),
+                             YarnMappings(write_jar(self.root / "new.jar", NEW_MAPPINGS)))
+
+    def build_index(self) -> YarnDiffIndex:
+        index = YarnDiffIndex.build(self.diff, self.root / "index" / "diff.idx", {"from": "old", "to": "new"})
+        self.addCleanup(index.close)
+        return index
+
+    def test_diff_statuses(self):
+        self.assertEqual(self.diff.lookup("c", "ItemUsageContext"),
+                         [{"kind": "class", "old": "net.minecraft.item.ItemUsageContext",
+                           "new": "net.minecraft.item.context.ItemUsageContext", "status": "moved"}])
+        self.assertEqual(self.diff.lookup("c", "util.Foo")[0]["status"], "renamed")
+        self.assertEqual(self.diff.lookup("c", "Gone")[0], {"kind": "class", "old": "net.minecraft.util.Gone",
+                                                             "new": None, "status": "removed"})
+        self.assertEqual(self.diff.lookup("m", "useOnBlock", ["Item"]),
+                         [{"kind": "method",
+                           "old": "net.minecraft.item.Item.useOnBlock(ItemUsageContext): void",
+                           "new": "net.minecraft.item.Item.useOnBlockAt(ItemUsageContext): void",
+                           "status": "renamed"}])
+        self.assertEqual(self.diff.lookup("m", "getName", ["Item"])[0]["status"], "signature")
+        self.assertEqual(self.diff.lookup("f", "count", ["Item"])[0]["status"], "unchanged")
+
+    def test_index_matches_diff_without_unchanged_entries(self):
+        index = self.build_index()
+        for kind, name, owners in (("c", "ItemUsageContext", None), ("c", "Gone", None),
+                                   ("m", "useOnBlock", ["Item"]), ("m", "getName", ["Item"])):
+            self.assertEqual(index.lookup(kind, name, owners), self.diff.lookup(kind, name, owners))
+        self.assertEqual(index.lookup("f", "count", ["Item"]), [])
+        self.assertEqual(index.meta["from"], "old")
+        self.assertEqual(index.meta["changes"], {"moved": 1, "renamed": 2, "removed": 1, "signature": 1})
+
+    def test_find_accepts_qualified_and_nested_names(self):
+        index = self.build_index()
+        for name in ("ItemUsageContext", "item.ItemUsageContext", "net.minecraft.item.ItemUsageContext"):
+            self.assertEqual([change["status"] for change in index.find(name)], ["moved"])
+        self.assertEqual([change["new"] for change in index.find("Item#useOnBlock")],
+                         ["net.minecraft.item.Item.useOnBlockAt(ItemUsageContext): void"])
+
+    def test_missing_key_returns_nothing(self):
+        index = self.build_index()
+        self.assertEqual(index.find("DoesNotExist"), [])
+        self.assertEqual(index.lookup("m", "neverMapped", ["Item"]), [])
+
+    def test_colliding_hashes_are_probed(self):
+        with mock.patch.object(YarnDiffIndex, "_hash", return_value=1):
+            index = self.build_index()
+            self.assertEqual(index.lookup("c", "Foo")[0]["new"], "net.minecraft.util.Bar")
+            self.assertEqual(index.lookup("c", "Gone")[0]["status"], "removed")
+            self.assertEqual(index.lookup("m", "getName", ["Item"])[0]["status"], "signature")
+            self.assertEqual(index.find("DoesNotExist"), [])
+
+    def test_reopened_index_reads_the_same(self):
+        self.build_index()
+        reopened = YarnDiffIndex(self.root / "index" / "diff.idx")
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.lookup("c", "Foo")[0]["status"], "renamed")
+        self.assertFalse((self.root / "index" / "diff.idx.part").exists())
+
+    def test_bad_magic_is_rejected(self):
+        path = self.root / "bogus.idx"
+        path.write_bytes(b"NOTADIFF" + bytes(16))
+        with self.assertRaises(ValueError):
+            YarnDiffIndex(path)
+
+    def test_truncated_index_is_rejected(self):
+        self.build_index().close()
+        data = (self.root / "index" / "diff.idx").read_bytes()
+        path = self.root / "truncated.idx"
+        for length in (0, 10, YarnDiffIndex.HEADER.size + 5, len(data) // 2, len(data) - 1):
+            path.write_bytes(data[:length])
+            with self.subTest(length=length), self.assertRaises(ValueError):
+                YarnDiffIndex(path)
+
+    def test_switcher_rebuilds_a_truncated_index(self):
+        switcher = VersionSwitcher(self.root, MetadataCache(self.root / "cache", "offline"))
+        switcher._yarn_mappings = {"old": self.diff.old, "new": self.diff.new}
+        with contextlib.redirect_stdout(io.StringIO()):
+            switcher.yarn_diff("old", "new").close()
+        path = self.root / "cache" / "yarn" / "diff-old-new.idx"
+        path.write_bytes(path.read_bytes()[:-20])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            index = switcher.yarn_diff("old", "new")
+        self.addCleanup(index.close)
+        self.assertIn("rebuilding", output.getvalue())
+        self.assertEqual(index.lookup("c", "Foo")[0]["status"], "renamed")
+
+    def test_javac_symbol_names_the_missing_class(self):
+        failure = GradleFailure("compile", "cannot find symbol", "OxidizerItem.java", 3,
+                                {"symbol": "class ItemUsageContext", "location": "package net.minecraft.item"})
+        self.assertEqual(javac_symbol(failure), ("c", "net.minecraft.item.ItemUsageContext", []))
+
+    def test_javac_symbol_keeps_api_owners(self):
+        failure = GradleFailure("compile", "method register in class Registry<T> cannot be applied to given types;",
+                                "OxifyItems.java", 14)
+        self.assertEqual(javac_symbol(failure, "public final class OxifyItems {", ["OxifyItems"]),
+                         ("m", "register", ["Registry"]))
+
+    def test_javac_symbol_uses_supertypes_of_mod_classes(self):
+        failure = GradleFailure("compile", "cannot find symbol", "OxidizerItem.java", 20,
+                                {"symbol": "method useOnBlock(ItemUsageContext)", "location": "class OxidizerItem"})
+        source = "public class OxidizerItem extends Item {"
+        self.assertEqual(javac_symbol(failure, source, ["OxidizerItem"]), ("m", "useOnBlock", ["Item"]))
+
+    def test_javac_symbol_skips_members_of_mod_classes(self):
+        failure = GradleFailure("compile", "method register in class OxifyItems cannot be applied to given types;",
+                                "OxifyItems.java", 30)
+        self.assertEqual(javac_symbol(failure, "public final class OxifyItems {", ["OxifyItems"]),
+                         ("m", "register", None))
+        # Declared in another file: the supertypes of the calling class say nothing about it
+        caller = "public class Oxify implements ModInitializer {"
+        self.assertEqual(javac_symbol(failure, caller, ["Oxify", "OxifyItems"]), ("m", "register", None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,9 +8,13 @@ updates all necessary configuration files, and attempts to build the mod.
 Usage:
     python version_switcher.py <minecraft_version> <mod_version>
 
+    python version_switcher.py matrix <minecraft_version:mod_version>...
+    python version_switcher.py version-index {build,update,show}
+
 Example:
     python version_switcher.py 1.21.1 1.2.0
     python version_switcher.py 1.20.4 1.1.0
+    python version_switcher.py matrix 1.20.4:1.1.0 1.21.1:1.2.0
 """
 
 import sys
@@ -18,54 +22,1673 @@ import os
 import subprocess
 import re
 import json
+import xml.etree.ElementTree as ElementTree
+import signal
 import argparse
+import contextlib
+import datetime
+import difflib
+import functools
+import hashlib
+import io
+import mmap
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import requests
-from typing import Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+# Metadata endpoints (overridable, e.g. to point at a local stand-in server)
+FABRIC_META_URL = os.environ.get("OXIFY_FABRIC_META_URL", "https://meta.fabricmc.net")
+GITHUB_API_URL = os.environ.get("OXIFY_GITHUB_API_URL", "https://api.github.com")
+FABRIC_MAVEN_URL = os.environ.get("OXIFY_FABRIC_MAVEN_URL", "https://maven.fabricmc.net")
+
+# Gradle plugin marker that `id 'fabric-loom'` resolves through
+LOOM_PLUGIN_MARKER = "fabric-loom/fabric-loom.gradle.plugin"
+# Plain release versions (no -SNAPSHOT, alpha, beta or rc suffix)
+RELEASE_VERSION = re.compile(r'^\d+(\.\d+)+$')
+
+# Overall deadline (seconds) for resolving all metadata lookups concurrently
+METADATA_DEADLINE = 20
+
+# Default location of the on-disk metadata cache
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "oxify-version-switcher"
+
+# Default location of the local version index used for offline resolution
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR / "version-index.json"
+VERSION_INDEX_FORMAT = 1
+
+# How long (seconds) a cached response is used without revalidating it
+METADATA_TTLS = {
+    "versions": 6 * 3600,
+    "fabric_api": 6 * 3600,
+    "gradle": 24 * 3600,
+    "loom": 3 * 3600,
+}
+
+# Tasks run by a version switch, in order, with their individual timeouts (seconds)
+GRADLE_TASK_TIMEOUTS = {
+    "clean": 300,
+    "genSources": 300,
+    "vscode": 120,
+    "build": 600,
+}
+
+# Minecraft version (minimum) -> Java release it needs and the oldest Loom line that supports it.
+# Rows are ordered newest first; the first row the Minecraft version reaches applies.
+MINECRAFT_REQUIREMENTS = [
+    ("1.21.5", {"java": 21, "loom": "1.10"}),
+    ("1.21.4", {"java": 21, "loom": "1.9"}),
+    ("1.21.2", {"java": 21, "loom": "1.8"}),
+    ("1.21", {"java": 21, "loom": "1.7"}),
+    ("1.20.5", {"java": 21, "loom": "1.6"}),
+    ("1.20.2", {"java": 17, "loom": "1.4"}),
+    ("1.18", {"java": 17, "loom": "0.10"}),
+    ("1.17", {"java": 16, "loom": "0.8"}),
+    ("1.14", {"java": 8, "loom": "0.2"}),
+]
+
+# Loom line (minimum) -> Gradle range it runs on, as [minimum, maximum) (None = open ended)
+LOOM_GRADLE_REQUIREMENTS = [
+    ("1.11", ("8.14", None)),
+    ("1.10", ("8.12", "9.0")),
+    ("1.9", ("8.11", "9.0")),
+    ("1.8", ("8.10", "9.0")),
+    ("1.7", ("8.8", "9.0")),
+    ("1.6", ("8.6", "9.0")),
+    ("1.5", ("8.4", "9.0")),
+    ("1.4", ("8.3", "9.0")),
+    ("1.3", ("8.2", "9.0")),
+    ("1.0", ("7.6", "9.0")),
+]
+
+# Tokens needed to find value spans in JSON that json.loads already accepted
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+JSON_SCALAR = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+
+# key=value / key: value / key value, ignoring comments (# or !)
+PROPERTY_LINE = re.compile(r'^[ \t\f]*(?P<key>[^\s:=#!\\][^\s:=\\]*)(?:[ \t\f]*[=:][ \t\f]*|[ \t\f]+|$)(?P<value>.*)$')
+
+# Journal of an in-progress multi-file update, relative to the project root
+JOURNAL_NAME = ".oxify-switch-journal.json"
+
+# Version properties tracked in gradle.properties
+VERSION_PROPERTIES = ("minecraft_version", "yarn_mappings", "loader_version", "fabric_version", "mod_version")
+# Changes that invalidate compiled classes and Loom's remapped jars
+CLEAN_TRIGGERS = {"minecraft_version", "yarn_mappings", "loader_version", "fabric_version",
+                  "loom_version", "gradle_version", "java_version"}
+# Changes that require regenerating the decompiled Minecraft sources
+GEN_SOURCES_TRIGGERS = {"minecraft_version", "yarn_mappings", "loom_version"}
+
+# Matches Gradle's plain-console task headers, e.g. "> Task :compileJava FAILED"
+GRADLE_TASK_LINE = re.compile(r'^> Task :(\S+?)(?: (FAILED|UP-TO-DATE|SKIPPED|NO-SOURCE|FROM-CACHE))?\s*$', re.MULTILINE)
+# Matches the failure summary, e.g. "Execution failed for task ':compileJava'."
+GRADLE_FAILED_TASK = re.compile(r"Execution failed for task ':(\S+?)'")
+# Lines worth echoing live while Gradle runs
+GRADLE_PROGRESS_LINE = re.compile(r'^(> Task |BUILD |FAILURE:|\* What went wrong|.*\berror: )')
+
+# Gradle failure classification: (category, pattern) tried in order on every output line.
+# Named groups become details of the failure; "key" (or the whole match) deduplicates it.
+GRADLE_FAILURE_PATTERNS = [
+    ("compile", re.compile(r'^(?P<file>\S.*?\.java):(?P<line>\d+): error: (?P<key>.+)$')),
+    ("network", re.compile(r"(?P<key>Could not (?:GET|HEAD) '[^']+'|Read timed out|Connect(?:ion)? timed out"
+                           r"|Connection reset|Received status code 5\d\d from server: .*)")),
+    # The version never ends in a dot, so Gradle's sentence-final period stays out of the coordinates
+    ("unresolved", re.compile(r"Plugin \[id: '(?P<plugin>[^']+)'(?:, version: '(?P<version>[^']+)')?\] was not found"
+                              r"|Could not (?:find|resolve) (?P<coordinates>[\w.\-]+:[\w.\-]+:[\w.\-+]*[\w\-+](?::[\w\-]+)?)")),
+    ("mixin", re.compile(r'(?P<key>(?:Mixin (?:apply|prepare|transformation) failed|Critical injection failure'
+                         r'|InvalidInjectionException|InvalidMixinException|MixinTransformerError)\b.*)')),
+    ("mappings", re.compile(r'(?P<key>(?:Failed to (?:re)?map|Failed to setup Minecraft|Unknown (?:mapping )?namespace'
+                            r'|Mapping(?:s)? (?:mismatch|conflict)|Could not find mappings).*)', re.IGNORECASE)),
+]
+# javac's explanation lines following a compile error, e.g. "  symbol:   method of(Settings)"
+JAVAC_DETAIL_LINE = re.compile(r'^\s+(?P<name>symbol|location|required|found|reason):\s+(?P<value>.+)$')
+
+# Number of trailing Gradle output lines kept for error reporting
+GRADLE_TAIL_LINES = 200
+
+# Throwaway project resolving the new versions' artifacts into the shared Gradle cache
+PREFETCH_BUILD_SCRIPT = """repositories {{
+    maven {{ url = '{maven_url}/' }}
+    mavenCentral()
+}}
+configurations {{
+    prefetch
+}}
+dependencies {{
+{dependencies}
+}}
+tasks.register('prefetch') {{
+    def artifacts = configurations.prefetch
+    doLast {{
+        println "Prefetched ${{artifacts.files.size()}} artifacts"
+    }}
+}}
+"""
+
+# Post-update steps and the steps each one must wait for. Steps without a path
+# between them (genSources and vscode) are passed to one gradlew invocation:
+# Gradle still runs them one after the other in this single-project build, but
+# startup and configuration are paid once instead of twice. A step runs after
+# its dependencies have finished, whether or not they succeeded; build waits
+# for every other step.
+GRADLE_STEP_DEPENDENCIES = {
+    "clean": (),
+    "genSources": ("clean",),
+    "vscode": ("clean",),
+    "build": ("clean", "genSources", "vscode"),
+}
+
+# Optional IDE integration steps, skipped with --no-ide
+IDE_TASKS = ("vscode",)
+
+# First Gradle release with a stable configuration cache
+CONFIGURATION_CACHE_GRADLE = "8.1"
+
+# `gradlew --status` rows: PID, status, Gradle version
+GRADLE_DAEMON_LINE = re.compile(r'^\s*(\d+)\s+(IDLE|BUSY|STOPPING|STOPPED|CANCELED)\s+(\S+)')
+
+# Tiny v2 file inside net.fabricmc:yarn:<version>:v2
+YARN_MAPPINGS_ENTRY = "mappings/mappings.tiny"
+
+# javac's "symbol:" line, e.g. "class ItemUsageContext" or "method register(String,Item)"
+JAVAC_SYMBOL = re.compile(r'^(?P<kind>class|interface|enum|method|variable|constructor)\s+(?P<name>[\w$]+)')
+# "method register in class Registry<T> cannot be applied to given types;"
+JAVAC_MEMBER_ERROR = re.compile(r'^(?P<kind>method|constructor) (?P<name>[\w$]+) in (?:class|interface|enum) (?P<owner>[\w.$]+)')
+JAVAC_OVERRIDE_ERROR = "method does not override or implement a method from a supertype"
+JAVA_SUPERTYPES = re.compile(r'\b(?:extends|implements)\s+([\w.$]+(?:\s*<[^{]*?>)?(?:\s*,\s*[\w.$]+(?:\s*<[^{]*?>)?)*)')
+JAVA_PRIMITIVES = {"Z": "boolean", "B": "byte", "C": "char", "S": "short", "I": "int",
+                   "J": "long", "F": "float", "D": "double", "V": "void"}
+
+# Connection pool and retry defaults for the shared HTTP session
+DEFAULT_POOL_SIZE = 4
+DEFAULT_RETRIES = 3
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES) -> requests.Session:
+    """Create a keep-alive HTTP session with per-host connection pools and retry backoff"""
+    retry = Retry(total=retries,
+                  backoff_factor=0.5,
+                  status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "oxify-version-switcher"
+    return session
+
+class MetadataCache:
+    """On-disk cache for metadata responses with TTL and ETag/Last-Modified revalidation.
+    
+    Modes:
+        default - serve fresh entries from disk, revalidate stale ones
+        refresh - always revalidate with the server, ignoring the TTL
+        offline - never touch the network, serve whatever is cached
+    """
+    
+    MODES = ("default", "refresh", "offline")
+    
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, mode: str = "default"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._lock = threading.Lock()
+    
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+    
+    def _record(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a URL (with its body), or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            entry = json.loads(meta_path.read_text(encoding='utf-8'))
+            entry["body"] = body_path.read_bytes()
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        """Store a response body and its validators"""
+        meta_path, body_path = self._paths(url)
+        entry = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._replace(body_path, body)
+        self._replace(meta_path, json.dumps(entry).encode('utf-8'))
+    
+    def _replace(self, path: Path, data: bytes):
+        # Write to a unique temp file first so concurrent lookups never see partial files
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    
+    def fetch(self, url: str, ttl: float, get: Callable[..., Any]) -> Optional[bytes]:
+        """Return the body for a URL, downloading it with `get` only when needed.
+        
+        Returns None when the server answers with anything other than 200/304.
+        """
+        entry = self.load(url)
+        
+        if self.mode == "offline":
+            if entry is None:
+                raise RuntimeError(f"{url} is not cached and --offline was given")
+            self._record("hits")
+            return entry["body"]
+        
+        if entry is not None and self.mode == "default" and time.time() - entry["fetched_at"] < ttl:
+            self._record("hits")
+            return entry["body"]
+        
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        
+        response = get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and entry is not None:
+            self.store(url, entry["body"], entry.get("etag"), entry.get("last_modified"))
+            self._record("revalidated")
+            return entry["body"]
+        if response.status_code == 200:
+            self.store(url, response.content,
+                       response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            self._record("misses")
+            return response.content
+        return None
+    
+    def display_stats(self):
+        """Print cache hit/miss counts for this run"""
+        print(f"\n🗄  Metadata cache ({self.mode}): {self.stats['hits']} hit(s), "
+              f"{self.stats['revalidated']} revalidated, {self.stats['misses']} full download(s)")
+
+@dataclass
+class GradleFailure:
+    """One distinct problem found in Gradle output"""
+    category: str
+    message: str
+    file: Optional[str] = None
+    line: Optional[int] = None
+    details: Dict[str, str] = field(default_factory=dict)
+    # How many times the same problem was reported
+    count: int = 1
+
+class GradleLogAnalyzer:
+    """Classify Gradle output into deduplicated failures while it streams.
+    
+    Lines are inspected one at a time and only the distinct failures are kept, so
+    memory use does not grow with the size of the log.
+    """
+    
+    def __init__(self):
+        self.failures: Dict[tuple, GradleFailure] = {}
+        # The compile error that javac's symbol/location lines belong to
+        self._compile_error: Optional[GradleFailure] = None
+        self._excerpt_pending = False
+    
+    def feed(self, line: str):
+        if self._compile_error is not None:
+            match = JAVAC_DETAIL_LINE.match(line)
+            if match:
+                self._compile_error.details.setdefault(match.group("name"), match.group("value").strip())
+                return
+            if self._excerpt_pending or line.startswith((" ", "\t")):
+                # Source excerpt (unindented for top-level lines such as imports) and caret line
+                self._excerpt_pending = False
+                return
+            self._compile_error = None
+        
+        for category, pattern in GRADLE_FAILURE_PATTERNS:
+            match = pattern.search(line)
+            if not match:
+                continue
+            groups = {name: value for name, value in match.groupdict().items() if value}
+            key = (groups.pop("key", None) or groups.get("coordinates") or groups.get("plugin")
+                   or match.group(0).strip())
+            if category == "compile":
+                failure = self.add(category, key, file=groups["file"], line=int(groups["line"]))
+                self._compile_error = failure if failure.count == 1 else None
+                self._excerpt_pending = True
+            else:
+                self.add(category, match.group(0).strip(), key=key, **groups)
+            return
+    
+    def add(self, category: str, message: str, key: Optional[str] = None, file: Optional[str] = None,
+            line: Optional[int] = None, **details: str) -> GradleFailure:
+        """Record a failure, merging it with an identical one seen before"""
+        identity = (category, key or message, file, line)
+        failure = self.failures.get(identity)
+        if failure is not None:
+            failure.count += 1
+            return failure
+        failure = GradleFailure(category, message, file, line, dict(details))
+        self.failures[identity] = failure
+        return failure
+    
+    def categories(self) -> set:
+        return {failure.category for failure in self.failures.values()}
+    
+    def decision(self) -> str:
+        """What to do about the failure: retry, rollback, fix-code or none"""
+        categories = self.categories()
+        if "network" in categories or categories == {"timeout"}:
+            # Transient: the same build may well pass on a second attempt
+            return "retry"
+        if categories & {"unresolved", "mappings"}:
+            # The chosen versions do not exist or do not fit together
+            return "rollback"
+        if categories & {"compile", "mixin"}:
+            return "fix-code"
+        return "none"
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        return [asdict(failure) for failure in self.failures.values()]
+    
+    def display(self, limit: int = 20):
+        """Print the failures grouped by category"""
+        labels = {
+            "compile": "Java compile errors",
+            "unresolved": "Unresolved plugins/dependencies",
+            "mixin": "Mixin failures",
+            "mappings": "Mapping problems",
+            "network": "Network problems",
+            "timeout": "Timeouts",
+        }
+        for category, label in labels.items():
+            failures = [failure for failure in self.failures.values() if failure.category == category]
+            if not failures:
+                continue
+            print(f"\n❌ {label} ({len(failures)}):")
+            for failure in failures[:limit]:
+                location = f"{Path(failure.file).name}:{failure.line}: " if failure.file else ""
+                repeated = f" (x{failure.count})" if failure.count > 1 else ""
+                print(f"   - {location}{failure.message}{repeated}")
+                for name, value in failure.details.items():
+                    print(f"       {name}: {value}")
+            if len(failures) > limit:
+                print(f"   ... and {len(failures) - limit} more")
+
+@dataclass
+class GradleRun:
+    """Outcome of a streamed Gradle invocation"""
+    tasks: List[str]
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    duration: float = 0.0
+    # Task name -> success for every task Gradle reported, in completion order
+    executed: Dict[str, bool] = field(default_factory=dict)
+    # Task name -> outcome and seconds since launch when the task reported
+    task_times: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tail: Deque[str] = field(default_factory=lambda: deque(maxlen=GRADLE_TAIL_LINES))
+    analysis: GradleLogAnalyzer = field(default_factory=GradleLogAnalyzer)
+    
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+    
+    def observe(self, line: str) -> Optional[Tuple[str, bool]]:
+        """Record an output line, returning (task, success) if it completes a task"""
+        self.tail.append(line)
+        self.analysis.feed(line)
+        match = GRADLE_TASK_LINE.match(line)
+        if match:
+            event = (match.group(1), match.group(2) != "FAILED")
+        else:
+            match = GRADLE_FAILED_TASK.search(line)
+            if not match:
+                return None
+            event = (match.group(1), False)
+        self.executed[event[0]] = event[1]
+        return event
+    
+    def task_succeeded(self, task: str) -> bool:
+        """Whether a requested task succeeded"""
+        if task in self.executed and not self.timed_out:
+            return self.executed[task]
+        # Tasks that never reported only count as successful if the whole run succeeded
+        return self.success
+    
+    def tail_text(self) -> str:
+        return "\n".join(self.tail)
+
+@dataclass
+class GradleOptions:
+    """Daemon and cache flags passed to every Gradle invocation"""
+    daemon: bool = True
+    build_cache: bool = False
+    configuration_cache: bool = False
+    warm_up: bool = False
+    prefetch: bool = False
+    
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "GradleOptions":
+        return cls(daemon=not args.no_daemon, build_cache=args.build_cache,
+                   configuration_cache=args.configuration_cache, warm_up=args.warm_up and not args.no_daemon,
+                   prefetch=args.prefetch and not args.offline)
+    
+    def flags(self, gradle_version: Optional[str]) -> List[str]:
+        flags = ['--daemon' if self.daemon else '--no-daemon']
+        if self.build_cache:
+            flags.append('--build-cache')
+        if self.configuration_cache and configuration_cache_supported(gradle_version):
+            flags.append('--configuration-cache')
+        return flags
+
+def configuration_cache_supported(gradle_version: Optional[str]) -> bool:
+    """The configuration cache is stable (and safe to request) from Gradle 8.1"""
+    return gradle_version is not None and parse_version(gradle_version) >= parse_version(CONFIGURATION_CACHE_GRADLE)
+
+def _version_tokens(text: Optional[str]) -> tuple:
+    # Numbers compare numerically and sort after words ("alpha" < "beta" < "rc" < 1);
+    # digits are split off words, so "pre10" compares as ("pre", 10) and sorts after "pre9"
+    if not text:
+        return ()
+    return tuple((1, int(token), "") if token.isdigit() else (0, 0, token.lower())
+                 for token in re.findall(r'\d+|[^\d.\-_]+', text))
+
+class Version:
+    """A parsed, comparable version string.
+    
+    Understands plain releases ("0.16.10"), pre-releases ("1.10-SNAPSHOT",
+    "8.14-rc-1") and Fabric's build suffixes: yarn's "+build.N" and Fabric
+    API's "+<minecraft version>". Releases compare numerically (1.10 > 1.9),
+    a pre-release sorts before its release, and the build suffix breaks ties.
+    """
+    
+    __slots__ = ("text", "release", "pre", "build", "_key")
+    
+    def __init__(self, text: str):
+        self.text = text
+        main, _, build = text.partition("+")
+        match = re.match(r'^(\d+(?:\.\d+)*)[-.]?(.*)$', main)
+        if match:
+            release = tuple(int(part) for part in match.group(1).split("."))
+            pre = match.group(2)
+        else:
+            # Snapshots such as "25w14a" have no numeric release part
+            release, pre = (), main
+        while len(release) > 1 and release[-1] == 0:
+            release = release[:-1]
+        self.release = release
+        self.pre = pre or None
+        self.build = build or None
+        self._key = (release, self.pre is None, _version_tokens(self.pre), _version_tokens(self.build))
+    
+    @property
+    def minecraft_version(self) -> Optional[str]:
+        """The Minecraft version in a Fabric API style "+1.21.5" suffix, if any"""
+        if self.build and self.build[0].isdigit():
+            return self.build
+        return None
+    
+    def line(self, parts: int = 2) -> tuple:
+        """The leading release components, e.g. (1, 10) for 1.10.5"""
+        return (self.release + (0,) * parts)[:parts]
+    
+    def __eq__(self, other):
+        return isinstance(other, Version) and self._key == other._key
+    
+    def __lt__(self, other: "Version") -> bool:
+        return self._key < other._key
+    
+    def __le__(self, other: "Version") -> bool:
+        return self._key <= other._key
+    
+    def __gt__(self, other: "Version") -> bool:
+        return self._key > other._key
+    
+    def __ge__(self, other: "Version") -> bool:
+        return self._key >= other._key
+    
+    def __hash__(self):
+        return hash(self._key)
+    
+    def __str__(self):
+        return self.text
+    
+    def __repr__(self):
+        return f"Version({self.text!r})"
+
+@functools.lru_cache(maxsize=None)
+def parse_version(text: str) -> Version:
+    """Parse a version string (memoized, the same strings are compared over and over)"""
+    return Version(text)
+
+def newest(versions: List[str]) -> Optional[str]:
+    """Return the newest of a list of version strings"""
+    return max(versions, key=parse_version, default=None)
+
+class CompatibilityResolver:
+    """Select a mutually compatible (Minecraft, yarn, loader, Fabric API, Loom, Gradle, Java) tuple"""
+    
+    def minecraft_requirements(self, minecraft_version: str) -> Dict[str, Any]:
+        version = parse_version(minecraft_version)
+        if version.release:
+            for minimum, requirements in MINECRAFT_REQUIREMENTS:
+                if version >= parse_version(minimum):
+                    return requirements
+            return MINECRAFT_REQUIREMENTS[-1][1]
+        # Snapshots are newer than every release in the table
+        return MINECRAFT_REQUIREMENTS[0][1]
+    
+    def gradle_range(self, loom_version: str) -> Tuple[str, Optional[str]]:
+        """The [minimum, maximum) Gradle versions a Loom version runs on"""
+        version = parse_version(loom_version)
+        for minimum, gradle_range in LOOM_GRADLE_REQUIREMENTS:
+            if version.line() >= parse_version(minimum).line():
+                return gradle_range
+        return LOOM_GRADLE_REQUIREMENTS[-1][1]
+    
+    def supports_gradle(self, loom_version: str, gradle_version: str) -> bool:
+        minimum, maximum = self.gradle_range(loom_version)
+        gradle = parse_version(gradle_version)
+        return gradle >= parse_version(minimum) and (maximum is None or gradle < parse_version(maximum))
+    
+    def fabric_api_candidates(self, minecraft_version: str, fabric_api_versions: List[str]) -> List[str]:
+        """Fabric API builds tagged for a Minecraft version, newest first"""
+        return sorted((version for version in fabric_api_versions
+                       if parse_version(version).minecraft_version == minecraft_version),
+                      key=parse_version, reverse=True)
+    
+    def loom_candidates(self, minecraft_version: str, loom_versions: List[str],
+                        gradle_version: Optional[str] = None) -> List[str]:
+        """Loom versions supporting a Minecraft version (and Gradle version, if given), newest first"""
+        minimum = parse_version(self.minecraft_requirements(minecraft_version)["loom"]).line()
+        return sorted((version for version in loom_versions
+                       if parse_version(version).line() >= minimum
+                       and (gradle_version is None or self.supports_gradle(version, gradle_version))),
+                      key=parse_version, reverse=True)
+    
+    def resolve(self, minecraft_version: str, yarn_versions: List[str], loader_versions: List[str],
+                fabric_api_versions: List[str], loom_versions: List[str],
+                wrapper_gradle: Optional[str], latest_gradle: Optional[str],
+                current_loom: Optional[str] = None) -> Dict[str, Any]:
+        """Pick the newest compatible version of every dependency.
+        
+        Missing candidates resolve to None. `notes` explains compromises that need
+        attention (e.g. the wrapper must be updated), `held_back` lists newer
+        versions skipped because they need a newer Gradle than the wrapper's. The
+        wrapper itself is never changed: if no Loom fits it, the current Loom is kept
+        and the Gradle version the newest Loom needs is only suggested.
+        """
+        requirements = self.minecraft_requirements(minecraft_version)
+        notes = []
+        
+        # Fabric API versions carry the Minecraft version they were built for
+        matching_fabric_api = self.fabric_api_candidates(minecraft_version, fabric_api_versions)
+        if fabric_api_versions and not matching_fabric_api:
+            notes.append(f"No Fabric API build is tagged +{minecraft_version} - using the newest listed one")
+        
+        # Loom must support the Minecraft version and run on the Gradle wrapper
+        looms = self.loom_candidates(minecraft_version, loom_versions)
+        if loom_versions and not looms:
+            notes.append(f"No published Fabric Loom release supports Minecraft {minecraft_version} "
+                         f"(needs {requirements['loom']}+)")
+        
+        gradle_version = wrapper_gradle or latest_gradle
+        loom_version = None
+        held_back = {}
+        if looms:
+            if gradle_version is None:
+                loom_version = looms[0]
+            else:
+                loom_version = next((loom for loom in looms if self.supports_gradle(loom, gradle_version)), None)
+                if loom_version is None:
+                    minimum, maximum = self.gradle_range(looms[0])
+                    needed_gradle = (latest_gradle if latest_gradle and self.supports_gradle(looms[0], latest_gradle)
+                                     else minimum)
+                    loom_version = current_loom
+                    held_back["loom_version"] = looms[0]
+                    notes.append(f"Fabric Loom {looms[0]} needs Gradle {minimum}+"
+                                 f"{f' (below {maximum})' if maximum else ''} but the wrapper uses "
+                                 f"{wrapper_gradle} - "
+                                 f"{f'keeping Fabric Loom {current_loom}; ' if current_loom else ''}"
+                                 f"update gradle-wrapper.properties to {needed_gradle} and switch again")
+                elif loom_version != looms[0]:
+                    held_back["loom_version"] = looms[0]
+        
+        return {
+            "yarn_mappings": newest(yarn_versions),
+            "loader_version": newest(loader_versions),
+            "fabric_version": newest(matching_fabric_api or fabric_api_versions),
+            "loom_version": loom_version,
+            "gradle_version": gradle_version,
+            "java_version": requirements["java"],
+            "notes": notes,
+            "held_back": held_back,
+        }
+
+class FabricMetaIndex:
+    """In-memory index of Fabric Meta's aggregate /v2/versions document.
+    
+    The document lists every game version, yarn build, intermediary and loader
+    release, so a single download answers all yarn/loader/intermediary queries.
+    """
+    
+    def __init__(self, document: Dict[str, Any]):
+        self.game_versions = [entry["version"] for entry in document.get("game", [])]
+        self.stable_game_versions = [entry["version"] for entry in document.get("game", []) if entry.get("stable")]
+        # Minecraft version -> yarn entries, newest build first
+        self._yarn: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in document.get("mappings", []):
+            self._yarn.setdefault(entry["gameVersion"], []).append(entry)
+        for entries in self._yarn.values():
+            entries.sort(key=lambda entry: entry.get("build", 0), reverse=True)
+        # Intermediary versions are named after the Minecraft version they map
+        self._intermediary = {entry["version"]: entry for entry in document.get("intermediary", [])}
+        # Fabric Meta already lists loaders newest first
+        self.loaders = list(document.get("loader", []))
+    
+    def yarn_versions(self, minecraft_version: str) -> List[str]:
+        """All yarn versions for a Minecraft version, newest build first"""
+        return [entry["version"] for entry in self._yarn.get(minecraft_version, [])]
+    
+    def latest_yarn(self, minecraft_version: str) -> Optional[str]:
+        return newest(self.yarn_versions(minecraft_version))
+    
+    def intermediary(self, minecraft_version: str) -> Optional[str]:
+        """Maven coordinates of the intermediary mappings for a Minecraft version"""
+        entry = self._intermediary.get(minecraft_version)
+        return entry["maven"] if entry else None
+    
+    def loader_versions(self, stable_only: bool = True) -> List[str]:
+        return [entry["version"] for entry in self.loaders if entry.get("stable") or not stable_only]
+    
+    def latest_loader(self, stable_only: bool = True) -> Optional[str]:
+        return newest(self.loader_versions(stable_only))
+
+class VersionIndex:
+    """Compact local index mapping Minecraft versions to their dependency versions.
+    
+    Stored as packed JSON so suggest_versions can answer without any network
+    access (e.g. on air-gapped build hosts). `update` only fetches what may have
+    changed since the last sync.
+    """
+    
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        self.data = data if data is not None else {
+            "format": VERSION_INDEX_FORMAT,
+            "synced_at": None,
+            "gradle": None,
+            "loom": [],
+            "loader": [],
+            "minecraft": {},
+        }
+    
+    @classmethod
+    def load(cls, path: Path) -> "VersionIndex":
+        data = json.loads(path.read_text(encoding='utf-8'))
+        if data.get("format") != VERSION_INDEX_FORMAT:
+            raise ValueError(f"{path} has an unsupported index format, rebuild it with 'version-index build'")
+        return cls(data)
+    
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.data, separators=(",", ":")), encoding='utf-8')
+        os.replace(tmp_path, path)
+    
+    def update(self, switcher: "VersionSwitcher", full: bool = False, recent: int = 3,
+               jobs: int = DEFAULT_POOL_SIZE) -> Dict[str, int]:
+        """Sync the index with the metadata servers.
+        
+        Fabric API lists are only fetched for Minecraft versions that are new since
+        the last sync, plus the `recent` newest ones that still receive releases.
+        A full update refetches every version.
+        """
+        meta = switcher.get_meta_index()
+        minecraft = self.data["minecraft"]
+        loader_versions = sorted(meta.loader_versions(), key=parse_version, reverse=True)
+        self.data["loader"] = loader_versions
+        
+        indexed_versions = [version for version in meta.game_versions if meta.yarn_versions(version)]
+        recent_versions = set(meta.stable_game_versions[:recent])
+        stale = [version for version in indexed_versions
+                 if full or version not in minecraft or version in recent_versions]
+        
+        with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="version-index") as executor:
+            fetched = executor.map(self._fabric_api_versions, [switcher] * len(stale), stale)
+            # A failed fetch keeps the stored list until the next successful sync
+            fabric_api = {version: versions for version, versions in zip(stale, fetched) if versions is not None}
+        
+        for version in indexed_versions:
+            entry = minecraft.setdefault(version, {"fabric_api": []})
+            entry["yarn"] = meta.yarn_versions(version)
+            entry["intermediary"] = meta.intermediary(version)
+            # Dropped field: loaders are not tied to a Minecraft version, the index-wide list covers them
+            entry.pop("loader_range", None)
+            if version in fabric_api:
+                entry["fabric_api"] = fabric_api[version]
+        
+        self.data["loom"] = switcher.get_fabric_loom_versions() or self.data["loom"]
+        self.data["gradle"] = switcher.get_latest_gradle_version() or self.data["gradle"]
+        self.data["synced_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        return {"minecraft_versions": len(indexed_versions), "fabric_api_fetched": len(fabric_api),
+                "fabric_api_failed": len(stale) - len(fabric_api)}
+    
+    @staticmethod
+    def _fabric_api_versions(switcher: "VersionSwitcher", minecraft_version: str) -> Optional[List[str]]:
+        try:
+            return switcher.get_fabric_api_versions(minecraft_version)
+        except Exception as e:
+            print(f"Warning: Could not fetch Fabric API versions for {minecraft_version}: {e}")
+            return None
+    
+    def _entry(self, minecraft_version: str) -> Dict[str, Any]:
+        return self.data["minecraft"].get(minecraft_version, {})
+    
+    def yarn_versions(self, minecraft_version: str) -> List[str]:
+        return self._entry(minecraft_version).get("yarn", [])
+    
+    def fabric_api_versions(self, minecraft_version: str) -> List[str]:
+        return self._entry(minecraft_version).get("fabric_api", [])
+    
+    def loader_versions(self) -> List[str]:
+        return self.data["loader"]
+    
+    def loom_versions(self) -> List[str]:
+        return self.data["loom"]
+    
+    def latest_loader(self) -> Optional[str]:
+        return newest(self.data["loader"])
+    
+    def latest_loom(self) -> Optional[str]:
+        return newest(self.data["loom"])
+    
+    def gradle_version(self) -> Optional[str]:
+        return self.data["gradle"]
+    
+    def display(self, minecraft_version: Optional[str] = None):
+        """Print a summary of the index, or the entry of one Minecraft version"""
+        print(f"Version index synced at {self.data['synced_at'] or 'never'}")
+        print(f"  Minecraft versions: {len(self.data['minecraft'])}")
+        print(f"  Fabric Loader: {self.latest_loader() or 'N/A'} ({len(self.data['loader'])} stable)")
+        print(f"  Fabric Loom: {self.latest_loom() or 'N/A'} ({len(self.data['loom'])} releases)")
+        print(f"  Gradle: {self.gradle_version() or 'N/A'}")
+        if minecraft_version:
+            entry = self._entry(minecraft_version)
+            if not entry:
+                print(f"❌ Minecraft {minecraft_version} is not in the index")
+                return
+            print(f"\nMinecraft {minecraft_version}:")
+            print(f"  Yarn: {', '.join(entry['yarn'][:5]) or 'N/A'}")
+            print(f"  Fabric API: {', '.join(entry['fabric_api'][:5]) or 'N/A'}")
+            print(f"  Intermediary: {entry.get('intermediary') or 'N/A'}")
+
+def _descriptor_types(descriptor: str) -> List[str]:
+    """Java type names of a JVM descriptor, e.g. (Lnet/minecraft/item/ItemUsageContext;)V -> [ItemUsageContext, void]"""
+    types = []
+    for match in re.finditer(r'(\[*)(?:L([^;]+);|([ZBCSIJFDV]))', descriptor):
+        name = (match.group(2).rsplit("/", 1)[-1].replace("$", ".") if match.group(2)
+                else JAVA_PRIMITIVES[match.group(3)])
+        types.append(name + "[]" * len(match.group(1)))
+    return types
+
+def _java_name(name: str) -> str:
+    return name.replace("/", ".").replace("$", ".")
+
+def _name_segments(name: str) -> List[str]:
+    return re.split(r'[./$]', name)
+
+class YarnMappings:
+    """Yarn names from a tiny v2 mappings file, indexed on first use.
+    
+    Intermediary names stay the same across Minecraft versions, so two of these are
+    joined on them to find out what a yarn name became. The file is only parsed when
+    the first lookup needs it, once, into hash indexes.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._classes: Optional[Dict[str, str]] = None
+    
+    @contextlib.contextmanager
+    def _open(self):
+        if zipfile.is_zipfile(self.path):
+            with zipfile.ZipFile(self.path) as archive, archive.open(YARN_MAPPINGS_ENTRY) as entry:
+                yield io.TextIOWrapper(entry, encoding='utf-8')
+        else:
+            with open(self.path, encoding='utf-8') as stream:
+                yield stream
+    
+    def _load(self):
+        if self._classes is not None:
+            return
+        # intermediary -> named, named -> intermediary, simple name -> named
+        classes: Dict[str, str] = {}
+        class_names: Dict[str, str] = {}
+        simple_names: Dict[str, List[str]] = {}
+        # Descriptors are written in the file's first namespace
+        descriptor_classes: Dict[str, str] = {}
+        # (kind, owner, intermediary) -> (named, descriptor); (kind, named) -> [(owner, intermediary)]
+        members: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+        member_names: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        # (kind, intermediary) -> owners, to follow members that moved to another class
+        member_owners: Dict[Tuple[str, str], List[str]] = {}
+        
+        with self._open() as stream:
+            header = stream.readline().rstrip("\r\n").split("\t")
+            if header[:2] != ["tiny", "2"] or "intermediary" not in header or "named" not in header:
+                raise ValueError(f"{self.path} is not a tiny v2 file with intermediary and named names")
+            intermediary, named = header.index("intermediary") - 3, header.index("named") - 3
+            owner = None
+            for line in stream:
+                parts = line.rstrip("\r\n").split("\t")
+                if parts[0] == "c":
+                    names = parts[1:]
+                    owner = names[intermediary] or names[0]
+                    name = names[named] if named < len(names) and names[named] else owner
+                    classes[owner] = name
+                    class_names[name] = owner
+                    descriptor_classes[names[0]] = name
+                    simple_names.setdefault(_name_segments(name)[-1], []).append(name)
+                elif len(parts) > 3 and parts[0] == "" and parts[1] in ("m", "f") and owner is not None:
+                    kind, descriptor, names = parts[1], parts[2], parts[3:]
+                    member = names[intermediary] or names[0]
+                    name = names[named] if named < len(names) and names[named] else member
+                    members[(kind, owner, member)] = (name, descriptor)
+                    member_names.setdefault((kind, name), []).append((owner, member))
+                    member_owners.setdefault((kind, member), []).append(owner)
+        
+        self._class_names = class_names
+        self._simple_names = simple_names
+        self._descriptor_classes = descriptor_classes
+        self._members = members
+        self._member_names = member_names
+        self._member_owners = member_owners
+        self._classes = classes
+    
+    def find_classes(self, name: str) -> List[str]:
+        """Intermediary names of the classes a Java name can refer to (qualified, nested or simple)"""
+        self._load()
+        if name.replace(".", "/") in self._class_names:
+            return [self._class_names[name.replace(".", "/")]]
+        segments = _name_segments(name)
+        return [self._class_names[candidate] for candidate in self._simple_names.get(segments[-1], [])
+                if _name_segments(candidate)[-len(segments):] == segments]
+    
+    def find_members(self, kind: str, name: str, owners: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """(owner, intermediary) of the methods or fields with this name, preferring the given owners"""
+        self._load()
+        entries = self._member_names.get((kind, name), [])
+        if owners:
+            return [entry for entry in entries if entry[0] in owners] or entries
+        return entries
+    
+    def class_name(self, intermediary: str) -> Optional[str]:
+        self._load()
+        return self._classes.get(intermediary)
+    
+    def member(self, kind: str, owner: str, intermediary: str) -> Optional[Tuple[str, str]]:
+        """Named owner, name and descriptor of a member, looked up by intermediary names"""
+        self._load()
+        entry = self._members.get((kind, owner, intermediary))
+        if entry is None:
+            return None
+        descriptor = re.sub(r'L([^;]+);', lambda match: f"L{self._descriptor_classes.get(match.group(1), match.group(1))};",
+                            entry[1])
+        return self._classes[owner], entry[0], descriptor
+    
+    def member_owners(self, kind: str, intermediary: str) -> List[str]:
+        self._load()
+        return self._member_owners.get((kind, intermediary), [])
+    
+    def class_ids(self) -> List[str]:
+        self._load()
+        return list(self._classes)
+    
+    def member_ids(self) -> List[Tuple[str, str, str]]:
+        """(kind, owner, intermediary) of every method and field"""
+        self._load()
+        return list(self._members)
+
+class YarnDiff:
+    """What the yarn names of one Minecraft version became in another"""
+    
+    def __init__(self, old: YarnMappings, new: YarnMappings):
+        self.old = old
+        self.new = new
+    
+    @staticmethod
+    def _describe(kind: str, member: Optional[Tuple[str, str, str]]) -> Optional[str]:
+        if member is None:
+            return None
+        owner, name, descriptor = member
+        if kind == "f":
+            return f"{_java_name(owner)}.{name}: {_descriptor_types(descriptor)[0]}"
+        arguments, _, returns = descriptor[1:].partition(")")
+        return (f"{_java_name(owner)}.{name}({', '.join(_descriptor_types(arguments))})"
+                f": {_descriptor_types(returns)[0]}")
+    
+    def class_change(self, intermediary: str) -> Dict[str, Optional[str]]:
+        old_name, new_name = self.old.class_name(intermediary), self.new.class_name(intermediary)
+        if new_name is None:
+            status = "removed"
+        elif new_name == old_name:
+            status = "unchanged"
+        else:
+            same_simple = _name_segments(new_name)[-1] == _name_segments(old_name)[-1]
+            status = "moved" if same_simple else "renamed"
+        return {"kind": "class", "old": _java_name(old_name), "new": new_name and _java_name(new_name),
+                "status": status}
+    
+    def member_change(self, kind: str, owner: str, intermediary: str) -> Dict[str, Optional[str]]:
+        old_member = self.old.member(kind, owner, intermediary)
+        new_member = self.new.member(kind, owner, intermediary)
+        if new_member is None:
+            # Pulled up or pushed down into another class under the same intermediary name
+            moved_to = self.new.member_owners(kind, intermediary)
+            new_member = self.new.member(kind, moved_to[0], intermediary) if moved_to else None
+            status = "moved" if new_member else "removed"
+        elif new_member[1] != old_member[1]:
+            status = "renamed"
+        elif new_member[0] != old_member[0]:
+            status = "moved"
+        elif new_member[2] != old_member[2]:
+            status = "signature"
+        else:
+            status = "unchanged"
+        return {"kind": "method" if kind == "m" else "field", "old": self._describe(kind, old_member),
+                "new": self._describe(kind, new_member), "status": status}
+    
+    def lookup(self, kind: str, name: str, owners: Optional[List[str]] = None,
+               limit: int = 5) -> List[Dict[str, Optional[str]]]:
+        """What a class ("c"), method ("m") or field ("f") became.
+        
+        For members, owners are the old yarn names of the classes to look in. Every
+        entry has the old and new names and a status: unchanged, renamed, moved,
+        signature or removed.
+        """
+        if kind == "c":
+            return [self.class_change(intermediary) for intermediary in self.old.find_classes(name)[:limit]]
+        owner_ids = [intermediary for owner in owners or [] for intermediary in self.old.find_classes(owner)]
+        return [self.member_change(kind, owner, intermediary)
+                for owner, intermediary in self.old.find_members(kind, name, owner_ids)[:limit]]
+    
+    def changes(self):
+        """Yield (lookup keys, change) for every class and member that did not stay the same.
+        
+        Keys are "<kind>:<name>" with the name as short or as qualified as a query may
+        write it: ItemUsageContext, item.ItemUsageContext, ..., or useOnBlock,
+        Item.useOnBlock, net.minecraft.item.Item.useOnBlock.
+        """
+        for intermediary in self.old.class_ids():
+            change = self.class_change(intermediary)
+            if change["status"] != "unchanged":
+                segments = change["old"].split(".")
+                yield {f"c:{'.'.join(segments[-count:])}" for count in range(1, len(segments) + 1)}, change
+        for kind, owner, intermediary in self.old.member_ids():
+            change = self.member_change(kind, owner, intermediary)
+            if change["status"] == "unchanged":
+                continue
+            name = self.old.member(kind, owner, intermediary)[1]
+            segments = _java_name(self.old.class_name(owner)).split(".")
+            keys = {f"{kind}:{name}"}
+            keys.update(f"{kind}:{'.'.join(segments[-count:])}.{name}" for count in (1, 2, len(segments)))
+            yield keys, change
+
+class YarnDiffIndex:
+    """Memory-mapped hash index of what changed between two yarn versions.
+    
+    Layout (little endian): header and JSON metadata, an open-addressing table of
+    (key hash, entry offset) slots, the change records, one entry per key holding
+    the key and the offsets of its records, then the magic again so a truncated
+    file is recognized. A query hashes the key, probes the table and reads one
+    entry, however large the mappings are. Symbols that stayed the same are not
+    stored.
+    """
+    
+    MAGIC = b"OXYDIFF2"
+    # magic, slot count, metadata length
+    HEADER = struct.Struct("<8sII")
+    # key hash (0 = empty), entry offset
+    SLOT = struct.Struct("<QI")
+    
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < self.HEADER.size or self._map[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError(f"{path} is not a yarn diff index")
+            magic, self._slot_count, meta_length = self.HEADER.unpack_from(self._map, 0)
+            self._slots = self.HEADER.size + meta_length
+            if (self._map[-len(self.MAGIC):] != self.MAGIC
+                    or len(self._map) < self._slots + self._slot_count * self.SLOT.size + len(self.MAGIC)):
+                raise ValueError(f"{path} is truncated")
+            self.meta = json.loads(self._map[self.HEADER.size:self._slots])
+        except ValueError:
+            self._map.close()
+            raise
+    
+    @staticmethod
+    def _hash(key: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+    
+    @classmethod
+    def build(cls, diff: YarnDiff, path: Path, meta: Dict[str, Any]) -> "YarnDiffIndex":
+        """Write the index of a diff to path and open it"""
+        records = bytearray()
+        postings: Dict[str, List[int]] = {}
+        statuses: Dict[str, int] = {}
+        for keys, change in diff.changes():
+            encoded = "\t".join((change["kind"], change["status"], change["old"], change["new"] or "")).encode('utf-8')
+            for key in keys:
+                postings.setdefault(key, []).append(len(records))
+            records += struct.pack("<H", len(encoded)) + encoded
+            statuses[change["status"]] = statuses.get(change["status"], 0) + 1
+        
+        meta_bytes = json.dumps({**meta, "changes": statuses, "keys": len(postings)}).encode('utf-8')
+        # At most half full, so probe sequences stay short
+        slot_count = 1 << max(4, (2 * len(postings)).bit_length())
+        records_start = cls.HEADER.size + len(meta_bytes) + slot_count * cls.SLOT.size
+        entries_start = records_start + len(records)
+        slots = bytearray(slot_count * cls.SLOT.size)
+        entries = bytearray()
+        for key, offsets in postings.items():
+            encoded = key.encode('utf-8')
+            digest = cls._hash(encoded)
+            slot = digest & (slot_count - 1)
+            while cls.SLOT.unpack_from(slots, slot * cls.SLOT.size)[0]:
+                slot = (slot + 1) & (slot_count - 1)
+            cls.SLOT.pack_into(slots, slot * cls.SLOT.size, digest, entries_start + len(entries))
+            entries += struct.pack(f"<H{len(encoded)}sI{len(offsets)}I", len(encoded), encoded, len(offsets),
+                                   *(records_start + offset for offset in offsets))
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".part")
+        _write_synced(partial, cls.HEADER.pack(cls.MAGIC, slot_count, len(meta_bytes)) + meta_bytes
+                      + slots + records + entries + cls.MAGIC)
+        os.replace(partial, path)
+        return cls(path)
+    
+    def _find(self, key: str) -> List[int]:
+        encoded = key.encode('utf-8')
+        digest = self._hash(encoded)
+        slot = digest & (self._slot_count - 1)
+        while True:
+            stored, entry = self.SLOT.unpack_from(self._map, self._slots + slot * self.SLOT.size)
+            if stored == 0:
+                return []
+            if stored == digest:
+                (length,) = struct.unpack_from("<H", self._map, entry)
+                if self._map[entry + 2:entry + 2 + length] == encoded:
+                    (count,) = struct.unpack_from("<I", self._map, entry + 2 + length)
+                    return list(struct.unpack_from(f"<{count}I", self._map, entry + 6 + length))
+            slot = (slot + 1) & (self._slot_count - 1)
+    
+    def _record(self, offset: int) -> Dict[str, Optional[str]]:
+        (length,) = struct.unpack_from("<H", self._map, offset)
+        kind, status, old, new = self._map[offset + 2:offset + 2 + length].decode('utf-8').split("\t")
+        return {"kind": kind, "old": old, "new": new or None, "status": status}
+    
+    def find(self, name: str, limit: int = 5) -> List[Dict[str, Optional[str]]]:
+        """What a class or member became, queried the way it is written in Java (Item.useOnBlock)"""
+        name = name.replace("$", ".").replace("#", ".")
+        return [self._record(offset) for kind in "cmf" for offset in self._find(f"{kind}:{name}")][:limit]
+    
+    def lookup(self, kind: str, name: str, owners: Optional[List[str]] = None,
+               limit: int = 5) -> List[Dict[str, Optional[str]]]:
+        """Same as YarnDiff.lookup, without the unchanged entries"""
+        offsets: List[int] = []
+        if kind != "c":
+            for owner in owners or []:
+                offsets.extend(offset for offset in self._find(f"{kind}:{owner.replace('$', '.')}.{name}")
+                               if offset not in offsets)
+        if not offsets:
+            offsets = self._find(f"{kind}:{name.replace('$', '.')}")
+        return [self._record(offset) for offset in offsets[:limit]]
+    
+    def close(self):
+        self._map.close()
+
+def javac_symbol(failure: GradleFailure, source: str = "",
+                 mod_classes: Iterable[str] = ()) -> Optional[Tuple[str, str, Optional[List[str]]]]:
+    """The API symbol a javac error is about as (kind, name, owners), if it names one.
+    
+    Kinds are tiny's: c, m and f. Owners are the Java names of the classes the member
+    was looked up in; when that is the mod's own class, its supertypes are used. Owners
+    are None for members of a mod class without supertypes outside the mod
+    (`mod_classes` are the simple names of the mod's classes): those are not yarn names.
+    """
+    kinds = {"class": "c", "interface": "c", "enum": "c", "method": "m", "constructor": "m", "variable": "f"}
+    owners: List[str] = []
+    location = failure.details.get("location", "")
+    match = re.match(r'(?:class|interface|enum)\s+([\w.$]+)|variable \w+ of type ([\w.$]+)|package ([\w.]+)', location)
+    package = None
+    if match:
+        if match.group(3):
+            package = match.group(3)
+        else:
+            owners.append(match.group(1) or match.group(2))
+    
+    lines = source.splitlines()
+    member_error = JAVAC_MEMBER_ERROR.match(failure.message)
+    symbol = JAVAC_SYMBOL.match(failure.details.get("symbol", ""))
+    if member_error:
+        kind, name = kinds[member_error.group("kind")], member_error.group("name")
+        owners = [member_error.group("owner")]
+    elif symbol:
+        kind, name = kinds[symbol.group("kind")], symbol.group("name")
+        if kind == "c" and package:
+            name = f"{package}.{name}"
+    elif failure.message.startswith(JAVAC_OVERRIDE_ERROR) and failure.line:
+        # javac points at @Override, the method is declared on one of the next lines
+        following = "\n".join(lines[failure.line:failure.line + 3])
+        declaration = re.search(r'(\w+)\s*\(', following)
+        if not declaration:
+            return None
+        kind, name = "m", declaration.group(1)
+    else:
+        return None
+    
+    if kind != "c":
+        # Members inherited by the mod's classes are declared on their supertypes (only
+        # known for the classes declared in this source file)
+        declared_here = set(re.findall(r'\b(?:class|interface|enum|record)\s+(\w+)', source))
+        own_classes = declared_here | set(mod_classes)
+        
+        def simple_name(owner: str) -> str:
+            return re.sub(r'<.*', '', owner).rsplit(".", 1)[-1]
+        
+        mod_owners = [owner for owner in owners if simple_name(owner) in own_classes]
+        owners = [owner for owner in owners if simple_name(owner) not in own_classes]
+        if not owners and all(simple_name(owner) in declared_here for owner in mod_owners):
+            for supertypes in JAVA_SUPERTYPES.findall(source):
+                owners.extend(re.sub(r'<[^<>]*>', '', supertypes).replace(" ", "").split(","))
+        owners = [re.sub(r'<.*', '', owner) for owner in owners if simple_name(owner) not in own_classes]
+        if mod_owners and not owners:
+            # Searching every yarn member with the name would only turn up unrelated renames
+            return kind, name, None
+    return kind, name, owners
+
+class RunReport:
+    """Per-phase timings and outcomes of a run, written as JSON with --report"""
+    
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "versions": {},
+            "previous_versions": {},
+            "metadata": {},
+            "phases": [],
+            "cache": {},
+            "success": None,
+        }
+    
+    @contextlib.contextmanager
+    def phase(self, name: str, **details: Any):
+        """Time a phase; the yielded dict can be filled with extra details"""
+        entry: Dict[str, Any] = {"name": name, "status": "ok", **details}
+        start = time.perf_counter()
+        try:
+            yield entry
+        except BaseException:
+            entry["status"] = "error"
+            raise
+        finally:
+            entry["duration"] = round(time.perf_counter() - start, 3)
+            with self._lock:
+                self.data["phases"].append(entry)
+    
+    def skip_phase(self, name: str, reason: str):
+        """Record a phase that was intentionally not run"""
+        with self._lock:
+            self.data["phases"].append({"name": name, "status": "skipped", "reason": reason, "duration": 0.0})
+    
+    def write(self, path: Path, cache_stats: Optional[Dict[str, int]] = None):
+        """Write the report as JSON"""
+        self.data["total_duration"] = round(time.perf_counter() - self._start, 3)
+        if cache_stats is not None:
+            self.data["cache"] = dict(cache_stats)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.data, indent=2) + "\n", encoding='utf-8')
+        print(f"📊 Run report written to {path}")
+
+class JsonDocument:
+    """Edit values of a JSON text in place, leaving every other byte untouched.
+    
+    Only the spans of the values that actually change are replaced (members that
+    don't exist yet are appended to their object), so formatting, key order and
+    the trailing newline survive and an unchanged document stays byte-identical.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.data = json.loads(text)
+    
+    def get(self, path: Tuple[str, ...], default: Any = None) -> Any:
+        value = self.data
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+    
+    def set(self, path: Tuple[str, ...], value: Any) -> bool:
+        """Set the value at a key path (whose parent object must exist), returning whether it changed"""
+        missing = object()
+        if self.get(path, missing) == value:
+            return False
+        encoded = json.dumps(value, ensure_ascii=False)
+        values, keys = self._spans()
+        if path in values:
+            start, end = values[path]
+            self.text = self.text[:start] + encoded + self.text[end:]
+        else:
+            self._insert(path, encoded, values, keys)
+        self.data = json.loads(self.text)
+        return True
+    
+    def _insert(self, path: Tuple[str, ...], encoded: str, values: Dict[tuple, Tuple[int, int]],
+                keys: Dict[tuple, int]):
+        parent_start, parent_end = values[path[:-1]]
+        member = f"{json.dumps(path[-1], ensure_ascii=False)}: {encoded}"
+        siblings = [child for child in keys if child[:-1] == path[:-1]]
+        if not siblings:
+            self.text = self.text[:parent_start + 1] + member + self.text[parent_start + 1:]
+            return
+        last = max(siblings, key=lambda child: keys[child])
+        # Indent like the last member when it sits on its own line
+        line_start = self.text.rfind("\n", parent_start, keys[last]) + 1
+        indent = self.text[line_start:keys[last]]
+        newline = "\r\n" if "\r\n" in self.text else "\n"
+        separator = f"{newline}{indent}" if line_start and not indent.strip() else " "
+        insert_at = values[last][1]
+        self.text = self.text[:insert_at] + f",{separator}{member}" + self.text[insert_at:]
+    
+    def _spans(self) -> Tuple[Dict[tuple, Tuple[int, int]], Dict[tuple, int]]:
+        """Map every key path to its value's (start, end) offsets and to its key's offset"""
+        text = self.text
+        values: Dict[tuple, Tuple[int, int]] = {}
+        keys: Dict[tuple, int] = {}
+        
+        def skip(i: int) -> int:
+            return JSON_WHITESPACE.match(text, i).end()
+        
+        def scan(i: int, path: tuple) -> int:
+            i = skip(i)
+            start = i
+            if text[i] == '{':
+                i = skip(i + 1)
+                while text[i] != '}':
+                    key, key_end = json.decoder.scanstring(text, i + 1)
+                    keys[path + (key,)] = i
+                    i = skip(scan(skip(key_end) + 1, path + (key,)))
+                    if text[i] == ',':
+                        i = skip(i + 1)
+                i += 1
+            elif text[i] == '[':
+                i = skip(i + 1)
+                index = 0
+                while text[i] != ']':
+                    i = skip(scan(i, path + (index,)))
+                    index += 1
+                    if text[i] == ',':
+                        i = skip(i + 1)
+                i += 1
+            elif text[i] == '"':
+                i = json.decoder.scanstring(text, i + 1)[1]
+            else:
+                i = JSON_SCALAR.match(text, i).end()
+            values[path] = (start, i)
+            return i
+        
+        scan(0, ())
+        return values, keys
+
+class PropertiesFile:
+    """Ordered line model of a .properties file.
+    
+    The text is split into lines once, with an index from key to the line that
+    defines it (the last one, as java.util.Properties does). Edits replace only
+    the value part of that line, so comments, blank lines and separators are kept.
+    """
+    
+    def __init__(self, text: str):
+        self.lines = text.split("\n")
+        self._parse()
+    
+    def _parse(self):
+        self.index: Dict[str, int] = {}
+        # Number of lines each entry spans, including continuation lines
+        self.extents: Dict[int, int] = {}
+        start = None
+        for number, line in enumerate(self.lines):
+            if start is None:
+                match = PROPERTY_LINE.match(line)
+                if match:
+                    self.index[match.group("key")] = number
+                elif not line.strip() or line.lstrip()[0] in "#!":
+                    # Comments and blank lines never continue
+                    self.extents[number] = 1
+                    continue
+                start = number
+            # A value ending in an odd number of backslashes continues on the next line
+            if (len(line) - len(line.rstrip("\\"))) % 2 == 0:
+                self.extents[start] = number - start + 1
+                start = None
+        if start is not None:
+            # Continued past the end of the file
+            self.extents[start] = len(self.lines) - start
+    
+    def get(self, key: str) -> Optional[str]:
+        if key not in self.index:
+            return None
+        number = self.index[key]
+        value = PROPERTY_LINE.match(self.lines[number]).group("value")
+        for line in self.lines[number + 1:number + self.extents.get(number, 1)]:
+            value = value[:-1] + line.lstrip()
+        return value.strip()
+    
+    def update(self, values: Dict[str, str], add_missing: bool = False) -> Dict[str, List[str]]:
+        """Apply all edits in one pass and report the keys that were changed, added or missing"""
+        report: Dict[str, List[str]] = {"changed": [], "added": [], "missing": []}
+        # Line number -> replacement for the entry (and its continuation lines)
+        replacements: Dict[int, str] = {}
+        added: List[str] = []
+        for key, value in values.items():
+            if key in self.index:
+                if self.get(key) != value:
+                    number = self.index[key]
+                    match = PROPERTY_LINE.match(self.lines[number])
+                    replacements[number] = self.lines[number][:match.start("value")] + value
+                    report["changed"].append(key)
+            elif add_missing:
+                added.append(f"{key}={value}")
+                report["added"].append(key)
+            else:
+                report["missing"].append(key)
+        if not replacements and not added:
+            return report
+        
+        lines: List[str] = []
+        number = 0
+        while number < len(self.lines):
+            extent = self.extents.get(number, 1)
+            if number in replacements:
+                lines.append(replacements[number])
+            else:
+                lines.extend(self.lines[number:number + extent])
+            number += extent
+        if added:
+            # Append after the last non-blank line
+            position = len(lines)
+            while position > 0 and not lines[position - 1].strip():
+                position -= 1
+            lines[position:position] = added
+        self.lines = lines
+        self._parse()
+        return report
+    
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+class FileTransaction:
+    """Apply a set of file rewrites all-or-nothing.
+    
+    New contents are staged in memory, written to fsynced temp files next to their
+    targets and only then renamed into place. A journal listing the temp files and
+    backups of the originals is written (itself atomically) before any of them, and
+    marked "committing" once they are all on disk, so an interrupted commit can be
+    completed or rolled back on the next start.
+    """
+    
+    def __init__(self, project_root: Path, journal_path: Optional[Path] = None):
+        self.project_root = project_root
+        self.journal_path = journal_path or project_root / JOURNAL_NAME
+        self.staged: Dict[Path, bytes] = {}
+    
+    def current(self, path: Path) -> Optional[bytes]:
+        """The content a path will have after commit (staged or on disk)"""
+        if path in self.staged:
+            return self.staged[path]
+        return path.read_bytes() if path.exists() else None
+    
+    def stage(self, path: Path, data: bytes):
+        self.staged[path] = data
+    
+    def commit(self) -> List[Path]:
+        """Write every staged change whose bytes differ from disk and return the files written"""
+        changes = {path: data for path, data in self.staged.items()
+                   if not path.exists() or path.read_bytes() != data}
+        self.staged.clear()
+        if not changes:
+            return []
+        
+        entries = []
+        for path in changes:
+            relative = path.relative_to(self.project_root)
+            entries.append({"path": str(relative),
+                            "temp": str(relative.with_name(f".{path.name}.oxify-new")),
+                            "backup": str(relative.with_name(f".{path.name}.oxify-old")) if path.exists() else None})
+        try:
+            # Recorded first, so temp files left by a crash while staging are found and removed
+            self._write_journal(entries, "staging")
+            for entry, (path, data) in zip(entries, changes.items()):
+                if entry["backup"]:
+                    _write_synced(self.project_root / entry["backup"], path.read_bytes())
+                _write_synced(self.project_root / entry["temp"], data)
+            # From here on the journal describes how to finish or undo the commit
+            self._write_journal(entries, "committing")
+        except Exception:
+            self._cleanup(entries)
+            raise
+        
+        try:
+            for entry in entries:
+                os.replace(self.project_root / entry["temp"], self.project_root / entry["path"])
+            _sync_directories(changes)
+        except Exception:
+            self.rollback()
+            raise
+        self._cleanup(entries)
+        return list(changes)
+    
+    def _write_journal(self, entries: List[Dict[str, Any]], state: str):
+        """Replace the journal atomically: fsynced temp file, rename, directory sync"""
+        temp = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        _write_synced(temp, json.dumps({
+            "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+            "state": state,
+            "files": entries,
+        }, indent=2).encode('utf-8'))
+        os.replace(temp, self.journal_path)
+        _sync_directories([self.journal_path])
+    
+    def pending(self) -> Optional[Dict[str, Any]]:
+        """Return the journal of an interrupted commit, if there is one"""
+        if not self.journal_path.exists():
+            return None
+        try:
+            journal = json.loads(self.journal_path.read_text(encoding='utf-8'))
+        except ValueError:
+            # Not written by this tool's atomic rename; nothing can be recovered from it
+            return {"created_at": None, "state": "staging", "files": []}
+        journal.setdefault("state", "committing")
+        return journal
+    
+    def complete(self) -> List[Path]:
+        """Finish an interrupted commit by renaming the remaining temp files into place"""
+        journal = self.pending() or {"state": "staging", "files": []}
+        if journal["state"] != "committing":
+            # Interrupted while staging: the temp files may be incomplete and nothing was renamed yet
+            self._cleanup(journal["files"])
+            return []
+        completed = []
+        for entry in journal["files"]:
+            temp = self.project_root / entry["temp"]
+            if temp.exists():
+                os.replace(temp, self.project_root / entry["path"])
+                completed.append(self.project_root / entry["path"])
+        self._cleanup(journal["files"])
+        return completed
+    
+    def rollback(self) -> List[Path]:
+        """Undo an interrupted commit by restoring the original files"""
+        journal = self.pending() or {"state": "staging", "files": []}
+        restored = []
+        for entry in journal["files"] if journal["state"] == "committing" else []:
+            path = self.project_root / entry["path"]
+            if entry["backup"] is None:
+                # The file did not exist before the commit
+                if path.exists() and not (self.project_root / entry["temp"]).exists():
+                    path.unlink()
+                    restored.append(path)
+            elif (self.project_root / entry["backup"]).exists():
+                os.replace(self.project_root / entry["backup"], path)
+                restored.append(path)
+        self._cleanup(journal["files"])
+        return restored
+    
+    def _cleanup(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            for key in ("temp", "backup"):
+                if entry.get(key):
+                    (self.project_root / entry[key]).unlink(missing_ok=True)
+        self.journal_path.unlink(missing_ok=True)
+        self.journal_path.with_name(self.journal_path.name + ".tmp").unlink(missing_ok=True)
+
+def _newline_style(data: Optional[bytes]) -> str:
+    """The line ending a file already uses (the platform's for new or single-line files)"""
+    if data is None or b"\n" not in data:
+        return os.linesep
+    return "\r\n" if b"\r\n" in data else "\n"
+
+def _write_synced(path: Path, data: bytes):
+    """Write a file and flush it to disk"""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _sync_directories(paths):
+    """Flush directory entries so renames survive a crash (no-op on Windows)"""
+    if os.name == 'nt':
+        return
+    for directory in {path.parent for path in paths}:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
 class VersionSwitcher:
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, cache: Optional[MetadataCache] = None,
+                 session: Optional[requests.Session] = None,
+                 fabric_meta_url: str = FABRIC_META_URL, github_api_url: str = GITHUB_API_URL,
+                 version_index: Optional["VersionIndex"] = None, fabric_maven_url: str = FABRIC_MAVEN_URL):
         self.project_root = project_root
+        self.version_index = version_index
+        self.fabric_meta_url = fabric_meta_url.rstrip("/")
+        self.github_api_url = github_api_url.rstrip("/")
+        self.fabric_maven_url = fabric_maven_url.rstrip("/")
+        self.cache = cache if cache is not None else MetadataCache()
+        # Every metadata fetch goes through this session so connections are reused per host
+        self.session = session if session is not None else create_session()
+        self.report = RunReport()
+        self.resolver = CompatibilityResolver()
+        self._meta_index: Optional[FabricMetaIndex] = None
+        self._meta_index_lock = threading.Lock()
+        self._transaction: Optional[FileTransaction] = None
+        self.last_build_run: Optional[GradleRun] = None
+        self.last_gradle_run: Optional[GradleRun] = None
+        self.gradle_options = GradleOptions()
+        # Work started in the background and joined before the Gradle phase
+        self._background: Dict[str, threading.Thread] = {}
+        # Gradle processes of the background steps, and whether they are being stopped
+        self._background_processes: Set[subprocess.Popen] = set()
+        self._stopping_background = threading.Event()
+        # Parsed yarn mappings by yarn version
+        self._yarn_mappings: Dict[str, YarnMappings] = {}
         self.gradle_properties = project_root / "gradle.properties"
         self.fabric_mod_json = project_root / "src" / "main" / "resources" / "fabric.mod.json"
         self.build_gradle = project_root / "build.gradle"
         self.gradle_wrapper_properties = project_root / "gradle" / "wrapper" / "gradle-wrapper.properties"
         
+    def _fetch_json(self, url: str, ttl: float) -> Any:
+        """Fetch and decode a JSON document through the metadata cache (None if unavailable)"""
+        body = self.cache.fetch(url, ttl, self.session.get)
+        if body is None:
+            return None
+        return json.loads(body)
+    
+    def get_meta_index(self) -> FabricMetaIndex:
+        """Download Fabric Meta's aggregate version document once and index it"""
+        with self._meta_index_lock:
+            if self._meta_index is None:
+                document = self._fetch_json(f"{self.fabric_meta_url}/v2/versions", METADATA_TTLS["versions"])
+                if not isinstance(document, dict):
+                    raise RuntimeError("Fabric Meta did not return a version document")
+                self._meta_index = FabricMetaIndex(document)
+            return self._meta_index
+    
+    def get_yarn_versions(self, minecraft_version: str) -> List[str]:
+        """Get all yarn mappings for a Minecraft version, newest build first"""
+        return self.get_meta_index().yarn_versions(minecraft_version)
+    
+    def get_loader_versions(self) -> List[str]:
+        """Get all stable Fabric Loader versions"""
+        return self.get_meta_index().loader_versions()
+    
     def get_latest_mappings(self, minecraft_version: str) -> Optional[str]:
         """Get the latest yarn mappings for a Minecraft version from Fabric Meta API"""
         try:
-            url = f"https://meta.fabricmc.net/v2/versions/yarn/{minecraft_version}"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    return data[0]["version"]  # Get the latest mapping
+            return self.get_meta_index().latest_yarn(minecraft_version)
         except Exception as e:
             print(f"Warning: Could not fetch latest yarn mappings: {e}")
         return None
     
     def get_latest_loader_version(self) -> Optional[str]:
-        """Get the latest Fabric Loader version"""
+        """Get the latest stable Fabric Loader version"""
         try:
-            url = "https://meta.fabricmc.net/v2/versions/loader"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    return data[0]["version"]
+            return self.get_meta_index().latest_loader()
         except Exception as e:
             print(f"Warning: Could not fetch latest loader version: {e}")
         return None
     
+    def get_intermediary(self, minecraft_version: str) -> Optional[str]:
+        """Get the intermediary mappings coordinates for a Minecraft version"""
+        try:
+            return self.get_meta_index().intermediary(minecraft_version)
+        except Exception as e:
+            print(f"Warning: Could not fetch intermediary mappings: {e}")
+        return None
+    
+    def get_fabric_api_versions(self, minecraft_version: str) -> List[str]:
+        """Get all Fabric API versions for a Minecraft version, newest first"""
+        url = f"{self.fabric_meta_url}/v2/versions/fabric-api/{minecraft_version}"
+        data = self._fetch_json(url, METADATA_TTLS["fabric_api"])
+        if data is None:
+            raise RuntimeError(f"Fabric Meta did not return the Fabric API versions for {minecraft_version}")
+        return [entry["version"] for entry in data]
+    
     def get_latest_fabric_api_version(self, minecraft_version: str) -> Optional[str]:
         """Get the latest Fabric API version for a Minecraft version"""
         try:
-            url = f"https://meta.fabricmc.net/v2/versions/fabric-api/{minecraft_version}"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    return data[0]["version"]
+            versions = self.get_fabric_api_versions(minecraft_version)
+            # Prefer builds tagged for this exact Minecraft version
+            matching = [version for version in versions
+                        if parse_version(version).minecraft_version == minecraft_version]
+            return newest(matching or versions)
         except Exception as e:
             print(f"Warning: Could not fetch latest fabric API version: {e}")
         return None
@@ -73,10 +1696,9 @@ class VersionSwitcher:
     def get_latest_gradle_version(self) -> Optional[str]:
         """Get the latest Gradle version"""
         try:
-            url = "https://api.github.com/repos/gradle/gradle/releases/latest"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
+            url = f"{self.github_api_url}/repos/gradle/gradle/releases/latest"
+            data = self._fetch_json(url, METADATA_TTLS["gradle"])
+            if data is not None:
                 tag_name = data.get("tag_name", "")
                 # Remove 'v' prefix if present
                 return tag_name.lstrip('v')
@@ -85,32 +1707,145 @@ class VersionSwitcher:
         return None
     
     def get_latest_fabric_loom_version(self) -> Optional[str]:
-        """Get the latest Fabric Loom version"""
+        """Get the newest Fabric Loom release actually published to the plugin repository"""
         try:
-            url = "https://api.github.com/repos/FabricMC/fabric-loom/releases/latest"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                tag_name = data.get("tag_name", "")
-                # Remove 'v' prefix if present
-                latest_version = tag_name.lstrip('v')
-                
-                # Check if this version is actually available in gradle plugin repository
-                # by falling back to a known good version if the latest fails
-                return latest_version
+            return newest(self.get_fabric_loom_versions())
         except Exception as e:
             print(f"Warning: Could not fetch latest Fabric Loom version: {e}")
         return None
     
-    def suggest_versions(self, minecraft_version: str) -> Dict[str, str]:
+    def get_fabric_loom_versions(self) -> List[str]:
+        """Get the Fabric Loom releases published as Gradle plugin, newest first.
+        
+        Reads the plugin marker's maven-metadata.xml rather than GitHub releases, so
+        every version returned can actually be resolved by `id 'fabric-loom'`.
+        """
+        url = f"{self.fabric_maven_url}/{LOOM_PLUGIN_MARKER}/maven-metadata.xml"
+        body = self.cache.fetch(url, METADATA_TTLS["loom"], self.session.get)
+        if body is None:
+            return []
+        root = ElementTree.fromstring(body)
+        versions = [element.text.strip() for element in root.iterfind("./versioning/versions/version")
+                    if element.text and RELEASE_VERSION.match(element.text.strip())]
+        return sorted(set(versions), key=parse_version, reverse=True)
+    
+    def _metadata_lookups(self, minecraft_version: str) -> Dict[str, Tuple[Callable[..., Any], tuple]]:
+        """Return the independent metadata lookups needed to suggest versions.
+        
+        Every lookup returns the candidate versions (the latest Gradle release for
+        `gradle_version`); the compatibility resolver picks from them afterwards.
+        """
+        if self.version_index is not None:
+            # Answer everything from the local index without touching the network
+            index = self.version_index
+            return {
+                "yarn_mappings": (index.yarn_versions, (minecraft_version,)),
+                "loader_version": (index.loader_versions, ()),
+                "fabric_version": (index.fabric_api_versions, (minecraft_version,)),
+                "gradle_version": (index.gradle_version, ()),
+                "loom_version": (index.loom_versions, ()),
+            }
+        return {
+            "yarn_mappings": (self.get_yarn_versions, (minecraft_version,)),
+            "loader_version": (self.get_loader_versions, ()),
+            "fabric_version": (self.get_fabric_api_versions, (minecraft_version,)),
+            "gradle_version": (self.get_latest_gradle_version, ()),
+            "loom_version": (self.get_fabric_loom_versions, ()),
+        }
+    
+    def _timed_lookup(self, func: Callable[..., Any], args: tuple,
+                      abandoned: Optional[threading.Event] = None) -> Tuple[Any, float]:
+        """Run a single lookup and return its result with the elapsed time"""
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            # Nobody is waiting for a lookup that missed the deadline
+            if abandoned is None or not abandoned.is_set():
+                print(f"Warning: Lookup {func.__name__} failed: {e}")
+            result = None
+        return result, time.perf_counter() - start
+    
+    def fetch_metadata(self, minecraft_version: str, concurrent: bool = True,
+                       deadline: float = METADATA_DEADLINE) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Resolve all metadata lookups, either concurrently or one after another.
+        
+        Returns the lookup results (None for failed or timed out lookups) and a
+        timing breakdown with the per-lookup durations and the total wall-clock time.
+        """
+        lookups = self._metadata_lookups(minecraft_version)
+        results: Dict[str, Any] = {}
+        durations: Dict[str, Optional[float]] = {}
+        start = time.perf_counter()
+        
+        if concurrent:
+            finished: Dict[str, Tuple[Any, float]] = {}
+            abandoned = threading.Event()
+            threads = []
+            for name, (func, args) in lookups.items():
+                def run(name=name, func=func, args=args):
+                    finished[name] = self._timed_lookup(func, args, abandoned)
+                # Daemon threads: unlike executor workers, a lookup stuck in retries is not
+                # joined at interpreter exit, so it cannot keep the CLI alive past the deadline
+                thread = threading.Thread(target=run, name=f"metadata-{name}", daemon=True)
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join(max(0.0, deadline - (time.perf_counter() - start)))
+            abandoned.set()
+            done = dict(finished)
+            for name in lookups:
+                if name in done:
+                    results[name], durations[name] = done[name]
+                else:
+                    print(f"Warning: Lookup for {name} did not finish within {deadline}s")
+                    results[name], durations[name] = None, None
+        else:
+            for name, (func, args) in lookups.items():
+                results[name], durations[name] = self._timed_lookup(func, args)
+        
+        timings = {
+            "mode": "concurrent" if concurrent else "serial",
+            "lookups": durations,
+            "wall_clock": time.perf_counter() - start,
+        }
+        return results, timings
+    
+    def display_timings(self, timings: Dict[str, Any]):
+        """Print the timing breakdown of a metadata resolution"""
+        print(f"\n⏱  Metadata resolution ({timings['mode']}):")
+        for name, duration in timings["lookups"].items():
+            shown = f"{duration:6.2f}s" if duration is not None else " timed out"
+            print(f"   {name:<16} {shown}")
+        serial_total = sum(d for d in timings["lookups"].values() if d is not None)
+        print(f"   {'wall clock':<16} {timings['wall_clock']:6.2f}s")
+        print(f"   {'serial sum':<16} {serial_total:6.2f}s")
+    
+    def suggest_versions(self, minecraft_version: str, concurrent: bool = True) -> Dict[str, str]:
         """Suggest appropriate versions for dependencies"""
         suggestions = {}
         warnings = []
         
         print(f"Fetching latest versions for Minecraft {minecraft_version}...")
         
+        with self.report.phase("metadata", mode="concurrent" if concurrent else "serial"):
+            results, timings = self.fetch_metadata(minecraft_version, concurrent=concurrent)
+        suggestions["_timings"] = timings
+        self.report.data["metadata"] = timings
+        
+        # Pick a mutually compatible set from the candidates
+        current_versions = self.read_current_versions()
+        resolution = self.resolver.resolve(minecraft_version,
+                                           results["yarn_mappings"] or [],
+                                           results["loader_version"] or [],
+                                           results["fabric_version"] or [],
+                                           results["loom_version"] or [],
+                                           wrapper_gradle=current_versions["gradle_version"],
+                                           latest_gradle=results["gradle_version"],
+                                           current_loom=current_versions["loom_version"])
+        
         # Get yarn mappings
-        yarn_mappings = self.get_latest_mappings(minecraft_version)
+        yarn_mappings = resolution["yarn_mappings"]
         if yarn_mappings:
             suggestions["yarn_mappings"] = yarn_mappings
             print(f"✓ Latest yarn mappings: {yarn_mappings}")
@@ -120,12 +1855,18 @@ class VersionSwitcher:
             print(f"⚠️  Using fallback yarn mappings: {suggestions['yarn_mappings']}")
             warnings.append(f"Yarn mappings for {minecraft_version} not found - using fallback {suggestions['yarn_mappings']}")
         
-        # Get loader version (keep static for now)
-        suggestions["loader_version"] = "0.16.10"
-        print(f"✓ Using Fabric Loader version: {suggestions['loader_version']}")
+        # Get loader version (answered from the same Fabric Meta document as yarn)
+        loader_version = resolution["loader_version"]
+        if loader_version:
+            suggestions["loader_version"] = loader_version
+            print(f"✓ Latest Fabric Loader version: {loader_version}")
+        else:
+            suggestions["loader_version"] = "0.16.10"  # Last known good loader
+            print(f"⚠️  Using fallback Fabric Loader version: {suggestions['loader_version']}")
+            warnings.append(f"Could not fetch latest Fabric Loader version - using fallback {suggestions['loader_version']}")
         
         # Get Fabric API version
-        fabric_version = self.get_latest_fabric_api_version(minecraft_version)
+        fabric_version = resolution["fabric_version"]
         if fabric_version:
             suggestions["fabric_version"] = fabric_version
             print(f"✓ Latest Fabric API version: {fabric_version}")
@@ -136,65 +1877,144 @@ class VersionSwitcher:
             warnings.append(f"to find the correct Fabric API version and update gradle.properties manually!")
         
         # Get Gradle version
-        gradle_version = self.get_latest_gradle_version()
+        gradle_version = resolution["gradle_version"]
         if gradle_version:
             suggestions["gradle_version"] = gradle_version
-            print(f"✓ Latest Gradle version: {gradle_version}")
+            print(f"✓ Compatible Gradle version: {gradle_version}")
         else:
             suggestions["gradle_version"] = "8.12"  # Current fallback
             print(f"⚠️  Using fallback Gradle version: {suggestions['gradle_version']}")
             warnings.append(f"Could not fetch latest Gradle version - using fallback {suggestions['gradle_version']}")
         
         # Get Fabric Loom version
-        loom_version = self.get_latest_fabric_loom_version()
+        loom_version = resolution["loom_version"]
         if loom_version:
             suggestions["loom_version"] = loom_version
-            print(f"✓ Latest Fabric Loom version: {loom_version}")
-            warnings.append(f"Fabric Loom {loom_version} may not be available in plugin repositories yet!")
-            warnings.append(f"If build fails, manually revert build.gradle to use version 1.10.1 or 1.9")
+            print(f"✓ Compatible published Fabric Loom version: {loom_version}")
+            if "loom_version" in resolution["held_back"]:
+                print(f"   ({resolution['held_back']['loom_version']} needs a newer Gradle than the wrapper's)")
         else:
             print(f"❌ Could not fetch Fabric Loom version")
             warnings.append(f"FABRIC LOOM VERSION NOT FOUND")
-            warnings.append(f"You MUST manually check https://github.com/FabricMC/fabric-loom/releases")
+            warnings.append(f"You MUST manually check {self.fabric_maven_url}/{LOOM_PLUGIN_MARKER}/maven-metadata.xml")
             warnings.append(f"to find a compatible Loom version and update build.gradle manually!")
         
+        # Java release required by the Minecraft version
+        suggestions["java_version"] = str(resolution["java_version"])
+        print(f"✓ Required Java version: {suggestions['java_version']}")
+        
+        for note in resolution["notes"]:
+            print(f"⚠️  {note}")
+            warnings.append(note)
+        
         # Store warnings for later display
         suggestions["_warnings"] = warnings
         
+        self.display_timings(timings)
+        
         return suggestions
     
-    def update_gradle_properties(self, minecraft_version: str, mod_version: str, suggestions: Dict[str, str]):
+    def _write_if_changed(self, path: Path, content: str) -> bool:
+        """Write a file only if its bytes would change, returning whether it was written.
+        
+        Leaving identical files untouched keeps Gradle's configuration cache and
+        processResources inputs valid, so the file's existing line endings are kept.
+        Inside `transaction()` the write is only staged.
+        """
+        current = self._transaction.current(path) if self._transaction is not None else (
+            path.read_bytes() if path.exists() else None)
+        new_bytes = content.replace("\n", _newline_style(current)).encode('utf-8')
+        if current == new_bytes:
+            return False
+        if self._transaction is not None:
+            self._transaction.stage(path, new_bytes)
+        else:
+            path.write_bytes(new_bytes)
+        return True
+    
+    def _read_text(self, path: Path) -> str:
+        """Read a project file with "\n" line endings, including writes staged by an open transaction"""
+        if self._transaction is not None:
+            data = self._transaction.current(path)
+            if data is None:
+                raise FileNotFoundError(path)
+        else:
+            data = path.read_bytes()
+        return data.decode('utf-8').replace("\r\n", "\n")
+    
+    @contextlib.contextmanager
+    def transaction(self, apply: bool = True):
+        """Stage every file write in the block and apply them atomically at the end.
+        
+        If the block raises, nothing is written. With apply=False the staged
+        changes are only kept on the yielded transaction (used by --dry-run).
+        """
+        self._transaction = FileTransaction(self.project_root)
+        try:
+            yield self._transaction
+            if apply:
+                self._transaction.commit()
+        finally:
+            self._transaction = None
+    
+    def recover_interrupted_update(self, rollback: bool = False) -> bool:
+        """Complete (or roll back) a file update that was interrupted mid-commit"""
+        transaction = FileTransaction(self.project_root)
+        journal = transaction.pending()
+        if journal is None:
+            return False
+        print(f"⚠️  Found an interrupted version switch from {journal.get('created_at') or 'an unknown time'}")
+        if journal["state"] != "committing":
+            transaction.complete()
+            print("✓ It stopped before any file was replaced; removed its temporary files")
+            return True
+        if rollback:
+            files = transaction.rollback()
+            print(f"✓ Rolled back {len(files)} file(s) to their previous content")
+        else:
+            files = transaction.complete()
+            print(f"✓ Completed the update of {len(files)} file(s)")
+        for path in files:
+            print(f"  - {path.relative_to(self.project_root)}")
+        return True
+    
+    def update_gradle_properties(self, minecraft_version: str, mod_version: str, suggestions: Dict[str, str]) -> bool:
         """Update the gradle.properties file with new versions"""
         print("Updating gradle.properties...")
         
         if not self.gradle_properties.exists():
             raise FileNotFoundError(f"gradle.properties not found at {self.gradle_properties}")
         
-        content = self.gradle_properties.read_text(encoding='utf-8')
-        
-        # Update versions
-        content = re.sub(r'minecraft_version=.*', f'minecraft_version={minecraft_version}', content)
-        content = re.sub(r'mod_version=.*', f'mod_version={minecraft_version}-{mod_version}', content)
+        properties = PropertiesFile(self._read_text(self.gradle_properties))
+        values = {
+            "minecraft_version": minecraft_version,
+            "mod_version": f"{minecraft_version}-{mod_version}",
+        }
         
         # Update suggested versions (only if they exist and are not warnings)
-        if "yarn_mappings" in suggestions:
-            content = re.sub(r'yarn_mappings=.*', f'yarn_mappings={suggestions["yarn_mappings"]}', content)
-        
-        if "loader_version" in suggestions:
-            content = re.sub(r'loader_version=.*', f'loader_version={suggestions["loader_version"]}', content)
+        for key in ("yarn_mappings", "loader_version", "fabric_version"):
+            if key in suggestions:
+                values[key] = suggestions[key]
         
         # Only update fabric_version if we actually found one
         if "fabric_version" in suggestions:
-            content = re.sub(r'fabric_version=.*', f'fabric_version={suggestions["fabric_version"]}', content)
             print(f"✓ Updated fabric_version to {suggestions['fabric_version']}")
         else:
             print("❌ NOT updating fabric_version - no valid version found!")
             print("   You MUST manually update this in gradle.properties!")
         
-        self.gradle_properties.write_text(content, encoding='utf-8')
-        print("✓ gradle.properties updated successfully")
+        changes = properties.update(values, add_missing=True)
+        for key in changes["added"]:
+            print(f"✓ Added missing property {key}={values[key]}")
+        
+        if self._write_if_changed(self.gradle_properties, properties.text):
+            print(f"✓ gradle.properties updated successfully ({len(changes['changed'])} changed, "
+                  f"{len(changes['added'])} added)")
+            return True
+        print("✓ gradle.properties unchanged")
+        return False
     
-    def update_gradle_wrapper(self, suggestions: Dict[str, str]):
+    def update_gradle_wrapper(self, suggestions: Dict[str, str]) -> bool:
         """Update the Gradle wrapper to the latest version"""
         print("Updating Gradle wrapper...")
         
@@ -203,9 +2023,9 @@ class VersionSwitcher:
         
         if "gradle_version" not in suggestions:
             print("⚠️  No Gradle version suggestion available, skipping wrapper update")
-            return
+            return False
         
-        content = self.gradle_wrapper_properties.read_text(encoding='utf-8')
+        content = self._read_text(self.gradle_wrapper_properties)
         gradle_version = suggestions["gradle_version"]
         
         # Update the distribution URL
@@ -214,177 +2034,504 @@ class VersionSwitcher:
         # Not updating gradle because it is better to just keep it and see errors on /gradlew runClient
         # content = re.sub(r'distributionUrl=.*', f'distributionUrl={new_url}', content)
         
-        self.gradle_wrapper_properties.write_text(content, encoding='utf-8')
-        print(f"✓ Gradle wrapper updated to version {gradle_version}")
+        if self._write_if_changed(self.gradle_wrapper_properties, content):
+            print(f"✓ Gradle wrapper updated to version {gradle_version}")
+            return True
+        print("✓ gradle-wrapper.properties unchanged")
+        return False
     
-    def update_build_gradle(self, suggestions: Dict[str, str]):
-        """Update build.gradle with the latest Fabric Loom version"""
+    def update_build_gradle(self, suggestions: Dict[str, str]) -> bool:
+        """Update build.gradle with the compatible Fabric Loom version and Java release"""
         print("Updating build.gradle...")
         
         if not self.build_gradle.exists():
             raise FileNotFoundError(f"build.gradle not found at {self.build_gradle}")
         
-        if "loom_version" not in suggestions:
-            print("❌ NOT updating build.gradle - no valid Loom version found!")
+        content = self._read_text(self.build_gradle)
+        new_content = content
+        
+        if "loom_version" in suggestions:
+            loom_version = suggestions["loom_version"]
+            # Update the fabric-loom plugin version
+            new_content, replaced = re.subn(r"id 'fabric-loom' version '[^']*'",
+                                            f"id 'fabric-loom' version '{loom_version}'", new_content)
+            # Check if the plugin declaration was found at all
+            if not replaced:
+                print(f"❌ Could not update Fabric Loom version in build.gradle")
+                print(f"   Please manually update the version to {loom_version} or a compatible version")
+                return False
+        else:
+            print("❌ NOT updating Fabric Loom in build.gradle - no valid Loom version found!")
             print("   You MUST manually update the Fabric Loom version in build.gradle!")
-            return
-        
-        content = self.build_gradle.read_text(encoding='utf-8')
-        loom_version = suggestions["loom_version"]
         
-        # Update the fabric-loom plugin version
-        new_content = re.sub(r"id 'fabric-loom' version '[^']*'", 
-                           f"id 'fabric-loom' version '{loom_version}'", content)
+        if "java_version" in suggestions:
+            # Keep the compiler release and source/target compatibility on the required Java
+            java_version = suggestions["java_version"]
+            new_content = re.sub(r'(options\.release = )\d+', rf'\g<1>{java_version}', new_content)
+            new_content = re.sub(r'JavaVersion\.VERSION_\w+', f'JavaVersion.VERSION_{java_version}', new_content)
         
-        # Check if the version was actually changed
-        if new_content != content:
-            self.build_gradle.write_text(new_content, encoding='utf-8')
-            print(f"✓ build.gradle updated with Fabric Loom version {loom_version}")
-            print(f"⚠️  WARNING: Loom {loom_version} might not be available in plugin repositories yet!")
-        else:
-            print(f"❌ Could not update Fabric Loom version in build.gradle")
-            print(f"   Please manually update the version to {loom_version} or a compatible version")
+        if self._write_if_changed(self.build_gradle, new_content):
+            print(f"✓ build.gradle updated (Fabric Loom {suggestions.get('loom_version', 'unchanged')}, "
+                  f"Java {suggestions.get('java_version', 'unchanged')})")
+            return True
+        print("✓ build.gradle unchanged")
+        return False
     
-    def update_fabric_mod_json(self, minecraft_version: str, suggestions: Dict[str, str]):
+    def update_fabric_mod_json(self, minecraft_version: str, suggestions: Dict[str, str]) -> bool:
         """Update the fabric.mod.json file with new Minecraft version dependency"""
         print("Updating fabric.mod.json...")
         
         if not self.fabric_mod_json.exists():
             raise FileNotFoundError(f"fabric.mod.json not found at {self.fabric_mod_json}")
         
-        with open(self.fabric_mod_json, 'r', encoding='utf-8') as f:
-            mod_json = json.load(f)
+        # Only the changed values are rewritten, the rest of the file keeps its formatting
+        mod_json = JsonDocument(self._read_text(self.fabric_mod_json))
         
         # Update dependencies
-        if "depends" in mod_json:
-            mod_json["depends"]["minecraft"] = f"~{minecraft_version}"
+        if isinstance(mod_json.get(("depends",)), dict):
+            mod_json.set(("depends", "minecraft"), f"~{minecraft_version}")
             
             # Update fabricloader version if we have a suggestion
             if "loader_version" in suggestions:
-                mod_json["depends"]["fabricloader"] = f">={suggestions['loader_version']}"
+                mod_json.set(("depends", "fabricloader"), f">={suggestions['loader_version']}")
             
             # For fabric-api, only update if we have a valid version
             if "fabric_version" in suggestions:
                 # Use wildcard for better compatibility with new MC versions
-                mod_json["depends"]["fabric-api"] = "*"
+                mod_json.set(("depends", "fabric-api"), "*")
                 print(f"✓ Set fabric-api dependency to '*' for maximum compatibility")
                 print(f"   (Found fabric version: {suggestions['fabric_version']})")
             else:
                 # Keep existing value, don't change if we don't have a valid version
-                current_fabric_api = mod_json["depends"].get("fabric-api", "*")
+                current_fabric_api = mod_json.get(("depends", "fabric-api"), "*")
                 print(f"❌ NOT updating fabric-api dependency - no valid version found!")
                 print(f"   Current value: {current_fabric_api}")
                 print(f"   You MUST manually verify this is correct!")
+            
+            if "java_version" in suggestions and mod_json.get(("depends", "java")) is not None:
+                mod_json.set(("depends", "java"), f">={suggestions['java_version']}")
+        
+        if self._write_if_changed(self.fabric_mod_json, mod_json.text):
+            print("✓ fabric.mod.json updated successfully")
+            return True
+        print("✓ fabric.mod.json unchanged")
+        return False
+    
+    def _gradle_command(self, *args: str) -> list:
+        """Build the gradlew command line for the current platform"""
+        if os.name == 'nt':  # Windows
+            return [str(self.project_root / 'gradlew.bat'), *args]
+        return [str(self.project_root / 'gradlew'), *args]
+    
+    def _gradle_flags(self) -> List[str]:
+        """Daemon/cache flags for the wrapper's Gradle version"""
+        gradle_version = self.read_current_versions()["gradle_version"]
+        if self.gradle_options.configuration_cache and not configuration_cache_supported(gradle_version):
+            print(f"⚠️  Gradle {gradle_version} has no stable configuration cache, not passing --configuration-cache")
+        return self.gradle_options.flags(gradle_version)
+    
+    def gradle_daemon_status(self) -> Optional[Dict[str, int]]:
+        """Count the daemons of the wrapper's Gradle version by status (None if unknown)"""
+        try:
+            result = subprocess.run(self._gradle_command('--status', '--console=plain'), cwd=self.project_root,
+                                    capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=60)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        gradle_version = self.read_current_versions()["gradle_version"]
+        counts: Dict[str, int] = {}
+        for line in result.stdout.splitlines():
+            match = GRADLE_DAEMON_LINE.match(line)
+            if match and (gradle_version is None or match.group(3) == gradle_version):
+                counts[match.group(2).lower()] = counts.get(match.group(2).lower(), 0) + 1
+        return counts
+    
+    def start_background(self, name: str, func: Callable[[], None], after: Tuple[str, ...] = ()):
+        """Run `func` on a background thread once the named background steps have finished"""
+        if name in self._background:
+            return
         
-        with open(self.fabric_mod_json, 'w', encoding='utf-8') as f:
-            json.dump(mod_json, f, indent=2, ensure_ascii=False)
+        def run():
+            self.wait_for_background(*after)
+            if not self._stopping_background.is_set():
+                func()
         
-        print("✓ fabric.mod.json updated successfully")
+        thread = threading.Thread(target=run, name=name, daemon=True)
+        self._background[name] = thread
+        thread.start()
     
-    def clean_project(self):
-        """Clean the project build directory"""
-        print("Cleaning project...")
+    def wait_for_background(self, *names: str) -> float:
+        """Join background steps (all of them if no names are given) and return the time spent waiting"""
+        start = time.perf_counter()
+        for name in names or list(self._background):
+            thread = self._background.get(name)
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+        return time.perf_counter() - start
+    
+    def stop_background(self):
+        """Kill the Gradle processes of unfinished background steps and wait for their threads"""
+        if not self._background:
+            return
+        self._stopping_background.set()
+        for process in list(self._background_processes):
+            self._kill_process_tree(process)
+        self.wait_for_background()
+        self._background.clear()
+        self._stopping_background.clear()
+    
+    def start_gradle_warm_up(self):
+        """Start a Gradle daemon in the background unless an idle one is already running.
+        
+        The daemon is started from a throwaway project that copies the project's
+        org.gradle.* properties, so it gets the same JVM arguments (and is reused by
+        the real build) without configuring Loom for the versions being replaced.
+        """
+        if self.gradle_options.daemon:
+            self.start_background("warm-up", self._warm_up_gradle)
+    
+    def start_prefetch(self, suggestions: Dict[str, str]):
+        """Download the new versions' Maven artifacts into the Gradle cache in the background.
+        
+        Runs after the warm-up (on the same daemon) while the user is still at the
+        confirmation prompt; Loom then finds yarn, loader and Fabric API cached.
+        """
+        self.start_background("prefetch", lambda: self._prefetch_artifacts(suggestions), after=("warm-up",))
+    
+    @contextlib.contextmanager
+    def _scratch_project(self, name: str, build_script: str = ""):
+        """A throwaway Gradle project sharing the project's org.gradle.* properties"""
+        properties = PropertiesFile(self._read_text(self.gradle_properties))
+        with tempfile.TemporaryDirectory(prefix=f"oxify-{name}-") as scratch:
+            scratch_root = Path(scratch)
+            (scratch_root / "settings.gradle").write_text(f"rootProject.name = 'oxify-{name}'\n", encoding='utf-8')
+            (scratch_root / "gradle.properties").write_text(
+                "".join(f"{key}={properties.get(key)}\n" for key in properties.index if key.startswith("org.gradle.")),
+                encoding='utf-8')
+            (scratch_root / "build.gradle").write_text(build_script, encoding='utf-8')
+            yield scratch_root
+    
+    def _run_scratch_task(self, phase: Dict[str, Any], scratch_root: Path, task: str, timeout: float):
         try:
-            if os.name == 'nt':  # Windows
-                result = subprocess.run([str(self.project_root / 'gradlew.bat'), 'clean'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=300)
-            else:  # Unix-like
-                result = subprocess.run([str(self.project_root / 'gradlew'), 'clean'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=300)
-            
-            if result.returncode == 0:
-                print("✓ Project cleaned successfully")
-                return True
+            process = subprocess.Popen(self._gradle_command('-p', str(scratch_root), task, *self._gradle_flags(),
+                                                            '-q', '--console=plain'),
+                                       cwd=scratch_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                       start_new_session=os.name != 'nt')
+        except OSError as e:
+            phase["status"] = f"failed: {e}"
+            return
+        self._background_processes.add(process)
+        try:
+            # stop_background may have run between the launch and the registration
+            if self._stopping_background.is_set():
+                self._kill_process_tree(process)
+            phase["exit_code"] = process.wait(timeout=timeout)
+            phase["status"] = ("stopped" if self._stopping_background.is_set()
+                               else "ok" if phase["exit_code"] == 0 else "failed")
+        except subprocess.TimeoutExpired as e:
+            self._kill_process_tree(process)
+            process.wait()
+            phase["status"] = f"failed: {e}"
+        finally:
+            self._background_processes.discard(process)
+    
+    def _prefetch_artifacts(self, suggestions: Dict[str, str]):
+        coordinates = [f"net.fabricmc:yarn:{suggestions['yarn_mappings']}:v2"]
+        if "loader_version" in suggestions:
+            coordinates.append(f"net.fabricmc:fabric-loader:{suggestions['loader_version']}")
+        if "fabric_version" in suggestions:
+            coordinates.append(f"net.fabricmc.fabric-api:fabric-api:{suggestions['fabric_version']}")
+        build_script = PREFETCH_BUILD_SCRIPT.format(
+            maven_url=self.fabric_maven_url,
+            dependencies="\n".join(f"    prefetch '{coordinate}'" for coordinate in coordinates))
+        with self.report.phase("gradle prefetch", artifacts=coordinates) as phase:
+            with self._scratch_project("prefetch", build_script) as scratch_root:
+                self._run_scratch_task(phase, scratch_root, "prefetch", GRADLE_TASK_TIMEOUTS["build"])
+    
+    def _warm_up_gradle(self):
+        with self.report.phase("gradle warm-up") as phase:
+            status = self.gradle_daemon_status()
+            phase["daemons"] = status
+            if status and status.get("idle"):
+                phase["status"] = "already warm"
+                return
+            with self._scratch_project("warm-up") as scratch_root:
+                self._run_scratch_task(phase, scratch_root, "help", 300)
+    
+    def wait_for_gradle_warm_up(self):
+        """Block until the warm-up and prefetch have finished, so builds don't race them for a daemon"""
+        if not self._background:
+            return
+        waited = self.wait_for_background()
+        steps = " and ".join(self._background)
+        self._background.clear()
+        print(f"🔥 Gradle {steps} done{f' (waited {waited:.1f}s)' if waited >= 0.1 else ' (fully overlapped)'}")
+    
+    def run_gradle(self, tasks: List[str], timeout: float, extra_args: Tuple[str, ...] = (),
+                   on_task: Optional[Callable[[str, bool], None]] = None) -> GradleRun:
+        """Run Gradle, streaming its output as it arrives.
+        
+        Progress lines are echoed live, only the last GRADLE_TAIL_LINES lines are kept
+        for error reporting, and `on_task` is called as each task completes.
+        """
+        with self.report.phase(f"gradle {' '.join(tasks)}", tasks=list(tasks)) as phase:
+            run = self._stream_gradle(tasks, timeout, extra_args, on_task)
+            phase["exit_code"] = run.returncode
+            phase["status"] = "ok" if run.success else "timeout" if run.timed_out else "failed"
+            phase["task_events"] = run.task_times
+            if run.analysis.failures:
+                phase["failures"] = run.analysis.summary()
+                phase["decision"] = run.analysis.decision()
+        self.last_gradle_run = run
+        if "build" in tasks:
+            self.last_build_run = run
+        return run
+    
+    def _stream_gradle(self, tasks: List[str], timeout: float, extra_args: Tuple[str, ...],
+                       on_task: Optional[Callable[[str, bool], None]]) -> GradleRun:
+        run = GradleRun(list(tasks))
+        start = time.perf_counter()
+        process = subprocess.Popen(self._gradle_command(*tasks, *extra_args, *self._gradle_flags(), '--console=plain'),
+                                   cwd=self.project_root,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT,
+                                   text=True,
+                                   encoding='utf-8',
+                                   errors='replace',
+                                   bufsize=1,
+                                   # Own process group so a timeout also stops gradlew's children
+                                   start_new_session=os.name != 'nt')
+        
+        def kill():
+            run.timed_out = True
+            run.analysis.add("timeout", f"gradlew {' '.join(tasks)} did not finish within {timeout:.0f}s")
+            self._kill_process_tree(process)
+        
+        watchdog = threading.Timer(timeout, kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            for raw_line in process.stdout:
+                line = raw_line.rstrip()
+                event = run.observe(line)
+                if event:
+                    run.task_times[event[0]] = {"success": event[1],
+                                                "completed_at": round(time.perf_counter() - start, 3)}
+                if event or GRADLE_PROGRESS_LINE.match(line):
+                    print(f"   {line}", flush=True)
+                if event and on_task:
+                    on_task(*event)
+            run.returncode = process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                self._kill_process_tree(process)
+                process.wait()
+            process.stdout.close()
+        run.duration = time.perf_counter() - start
+        return run
+    
+    def _kill_process_tree(self, process: subprocess.Popen):
+        """Kill a Gradle process together with everything it spawned"""
+        try:
+            if os.name == 'nt':
+                process.kill()
             else:
-                print(f"✗ Clean failed: {result.stderr}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print("✗ Clean timed out")
-            return False
+                os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    def _run_task(self, task: str, label: str) -> Optional[GradleRun]:
+        """Run a single Gradle task, reporting timeouts and launch errors"""
+        timeout = GRADLE_TASK_TIMEOUTS.get(task, 300)
+        try:
+            run = self.run_gradle([task], timeout)
+        except Exception as e:
+            print(f"✗ {label} failed: {e}")
+            return None
+        if run.timed_out:
+            print(f"✗ {label} timed out")
+            return None
+        return run
+    
+    def run_gradle_pipeline(self, tasks: list) -> Dict[str, bool]:
+        """Run all tasks in a single Gradle invocation and report per-task success"""
+        print(f"Running gradlew {' '.join(tasks)} --continue...")
+        timeout = sum(GRADLE_TASK_TIMEOUTS.get(task, 300) for task in tasks)
+        try:
+            run = self.run_gradle(tasks, timeout, ('--continue',))
         except Exception as e:
-            print(f"✗ Clean failed: {e}")
+            print(f"✗ Gradle run failed: {e}")
+            return {task: False for task in tasks}
+        if run.timed_out:
+            print(f"✗ Gradle run timed out ({timeout // 60} minutes)")
+        
+        outcomes = {task: run.task_succeeded(task) for task in tasks}
+        for task, success in outcomes.items():
+            print(f"{'✓' if success else '✗'} {task} {'succeeded' if success else 'failed'}")
+        
+        if outcomes.get("build"):
+            self.display_jar_files()
+        elif not all(outcomes.values()):
+            self.display_failure(run)
+        return outcomes
+    
+    def display_jar_files(self):
+        """List the JAR files produced by the build"""
+        build_libs = self.project_root / "build" / "libs"
+        if build_libs.exists():
+            jar_files = list(build_libs.glob("*.jar"))
+            if jar_files:
+                print(f"✓ Built JAR files:")
+                for jar_file in jar_files:
+                    print(f"  - {jar_file.name}")
+    
+    def clean_project(self):
+        """Clean the project build directory"""
+        print("Cleaning project...")
+        run = self._run_task("clean", "Clean")
+        if run is None:
             return False
+        if run.success:
+            print("✓ Project cleaned successfully")
+            return True
+        print(f"✗ Clean failed:\n{run.tail_text()}")
+        return False
     
     def build_project(self):
         """Build the project"""
         print("Building project...")
-        try:
-            if os.name == 'nt':  # Windows
-                result = subprocess.run([str(self.project_root / 'gradlew.bat'), 'build'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=600)
-            else:  # Unix-like
-                result = subprocess.run([str(self.project_root / 'gradlew'), 'build'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=600)
-            
-            if result.returncode == 0:
-                print("✓ Build completed successfully!")
-                
-                # Look for built JAR files
-                build_libs = self.project_root / "build" / "libs"
-                if build_libs.exists():
-                    jar_files = list(build_libs.glob("*.jar"))
-                    if jar_files:
-                        print(f"✓ Built JAR files:")
-                        for jar_file in jar_files:
-                            print(f"  - {jar_file.name}")
-                
-                return True
-            else:
-                print(f"✗ Build failed!")
-                print(f"Error output:\n{result.stderr}")
-                print(f"Standard output:\n{result.stdout}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print("✗ Build timed out (10 minutes)")
-            return False
-        except Exception as e:
-            print(f"✗ Build failed: {e}")
+        run = self._run_task("build", "Build")
+        if run is None:
             return False
+        if run.success:
+            print("✓ Build completed successfully!")
+            self.display_jar_files()
+            return True
+        print(f"✗ Build failed!")
+        self.display_failure(run)
+        return False
+    
+    def display_failure(self, run: GradleRun):
+        """Show the classified failures of a run, or its last lines if nothing was recognized"""
+        if not run.analysis.failures:
+            print(f"Last {len(run.tail)} lines of output:\n{run.tail_text()}")
+            return
+        run.analysis.display()
+    
+    def yarn_mappings_file(self, yarn_version: str) -> Optional[Path]:
+        """Find the tiny v2 yarn jar in the Gradle cache, or download it into the metadata cache"""
+        jar = f"yarn-{yarn_version}-v2.jar"
+        gradle_home = Path(os.environ.get("GRADLE_USER_HOME", Path.home() / ".gradle"))
+        for cached in (gradle_home / "caches" / "modules-2" / "files-2.1" / "net.fabricmc" / "yarn"
+                       / yarn_version).glob(f"*/{jar}"):
+            return cached
+        target = self.cache.cache_dir / "yarn" / jar
+        if target.exists():
+            return target
+        if self.cache.mode == "offline":
+            return None
+        response = self.session.get(f"{self.fabric_maven_url}/net/fabricmc/yarn/{yarn_version}/{jar}", timeout=60)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".part")
+        partial.write_bytes(response.content)
+        os.replace(partial, target)
+        return target
+    
+    def yarn_mappings(self, yarn_version: str) -> Optional[YarnMappings]:
+        if yarn_version not in self._yarn_mappings:
+            path = self.yarn_mappings_file(yarn_version)
+            if path is None:
+                return None
+            self._yarn_mappings[yarn_version] = YarnMappings(path)
+        return self._yarn_mappings[yarn_version]
+    
+    def yarn_diff(self, old_yarn: str, new_yarn: str, rebuild: bool = False) -> Optional[YarnDiffIndex]:
+        """Open the diff index between two yarn versions, building it from the mappings on first use"""
+        name = re.sub(r'[^\w.+-]', '_', f"diff-{old_yarn}-{new_yarn}.idx")
+        path = self.cache.cache_dir / "yarn" / name
+        if path.exists() and not rebuild:
+            try:
+                return YarnDiffIndex(path)
+            except (OSError, ValueError) as e:
+                # Written by an older version or damaged, build it again
+                print(f"⚠️  Corrupt yarn diff index ({e}) - rebuilding")
+        old, new = self.yarn_mappings(old_yarn), self.yarn_mappings(new_yarn)
+        if old is None or new is None:
+            return None
+        return YarnDiffIndex.build(YarnDiff(old, new), path, {"old": old_yarn, "new": new_yarn})
+    
+    def explain_compile_errors(self, run: GradleRun, old_yarn: str, new_yarn: str) -> List[Dict[str, Any]]:
+        """Map the compile errors of a run to the yarn names that changed between two versions"""
+        compile_errors = [failure for failure in run.analysis.failures.values()
+                          if failure.category == "compile" and failure.file]
+        if not compile_errors:
+            return []
+        diff = self.yarn_diff(old_yarn, new_yarn)
+        if diff is None:
+            return []
+        
+        explanations = []
+        sources: Dict[str, str] = {}
+        mod_classes = {path.stem for path in (self.project_root / "src").rglob("*.java")}
+        for failure in compile_errors:
+            if failure.file not in sources:
+                path = Path(failure.file)
+                sources[failure.file] = path.read_text(encoding='utf-8', errors='replace') if path.exists() else ""
+            symbol = javac_symbol(failure, sources[failure.file], mod_classes)
+            if symbol is None:
+                continue
+            kind, name, owners = symbol
+            # Members of the mod's own classes have no mapping to change
+            changes = diff.lookup(kind, name, owners) if owners is not None else []
+            if not changes and owners is not None:
+                continue
+            match = re.search(r'src/[^/]+/java/(.+)\.java$', Path(failure.file).as_posix())
+            explanations.append({
+                "file": failure.file,
+                "line": failure.line,
+                "mod_class": match.group(1).replace("/", ".") if match else Path(failure.file).stem,
+                "symbol": name,
+                "changes": changes,
+            })
+        diff.close()
+        return explanations
+    
+    def display_api_changes(self, run: GradleRun, old_yarn: Optional[str], new_yarn: Optional[str]):
+        """Print what the symbols behind the compile errors were renamed or moved to"""
+        if not old_yarn or not new_yarn or old_yarn == new_yarn:
+            return
+        try:
+            explanations = self.explain_compile_errors(run, old_yarn, new_yarn)
+        except (requests.exceptions.RequestException, OSError, ValueError, zipfile.BadZipFile, KeyError) as e:
+            print(f"⚠️  Could not compare yarn {old_yarn} with {new_yarn}: {e}")
+            return
+        self.report.data["api_changes"] = explanations
+        if not explanations:
+            return
+        print(f"\n🔎 API changes behind the compile errors (yarn {old_yarn} → {new_yarn}):")
+        for explanation in explanations:
+            print(f"   {explanation['mod_class']} ({Path(explanation['file']).name}:{explanation['line']}):")
+            if not explanation["changes"]:
+                print(f"     - {explanation['symbol']}: no mapping change found (declared by the mod)")
+            for change in explanation["changes"]:
+                target = change["new"] or "no longer exists"
+                print(f"     - {change['kind']} {change['old']}")
+                print(f"       {change['status']}: {target}")
     
     def run_gen_sources(self):
         """Run gradlew genSources to generate mappings"""
         print("Running gradlew genSources...")
-        try:
-            if os.name == 'nt':  # Windows
-                result = subprocess.run([str(self.project_root / 'gradlew.bat'), 'genSources'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=300)
-            else:  # Unix-like
-                result = subprocess.run([str(self.project_root / 'gradlew'), 'genSources'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=300)
-            
-            if result.returncode == 0:
-                print("✓ genSources completed successfully")
-                return True
-            else:
-                print(f"✗ genSources failed: {result.stderr}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print("✗ genSources timed out")
-            return False
-        except Exception as e:
-            print(f"✗ genSources failed: {e}")
+        run = self._run_task("genSources", "genSources")
+        if run is None:
             return False
+        if run.success:
+            print("✓ genSources completed successfully")
+            return True
+        print(f"✗ genSources failed:\n{run.tail_text()}")
+        return False
     
     def display_warnings(self, suggestions: Dict[str, str]):
         """Display a prominent warning box for manual steps needed"""
@@ -402,7 +2549,7 @@ class VersionSwitcher:
         print("\n" + "🔗 USEFUL LINKS:")
         print("   • Fabric API versions: https://modrinth.com/mod/fabric-api/versions")
         print("   • Fabric development: https://fabricmc.net/develop/")
-        print("   • Fabric Loom releases: https://github.com/FabricMC/fabric-loom/releases")
+        print(f"   • Fabric Loom releases: {self.fabric_maven_url}/{LOOM_PLUGIN_MARKER}/maven-metadata.xml")
         print("   • Gradle releases: https://gradle.org/releases/")
         
         print("\n" + "📝 FILES TO CHECK MANUALLY:")
@@ -422,42 +2569,343 @@ class VersionSwitcher:
     def run_vscode_setup(self):
         """Run gradlew vscode to setup VS Code integration"""
         print("Running gradlew vscode...")
-        try:
-            if os.name == 'nt':  # Windows
-                result = subprocess.run([str(self.project_root / 'gradlew.bat'), 'vscode'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=120)
-            else:  # Unix-like
-                result = subprocess.run([str(self.project_root / 'gradlew'), 'vscode'], 
-                                      cwd=self.project_root, 
-                                      capture_output=True, 
-                                      text=True,
-                                      timeout=120)
-            
-            if result.returncode == 0:
-                print("✓ vscode setup completed successfully")
-                return True
-            else:
-                print(f"✗ vscode setup failed: {result.stderr}")
-                print("Note: This may not be critical for the mod to work")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print("✗ vscode setup timed out")
-            return False
-        except Exception as e:
-            print(f"✗ vscode setup failed: {e}")
+        run = self._run_task("vscode", "vscode setup")
+        if run is None:
             return False
+        if run.success:
+            print("✓ vscode setup completed successfully")
+            return True
+        print(f"✗ vscode setup failed:\n{run.tail_text()}")
+        print("Note: This may not be critical for the mod to work")
+        return False
+    
+    def read_current_versions(self) -> Dict[str, Optional[str]]:
+        """Read the versions currently configured in the project files"""
+        versions: Dict[str, Optional[str]] = {}
+        properties = PropertiesFile(self._read_text(self.gradle_properties) if self.gradle_properties.exists() else "")
+        for key in VERSION_PROPERTIES:
+            versions[key] = properties.get(key)
+        
+        build_gradle = self._read_text(self.build_gradle) if self.build_gradle.exists() else ""
+        match = re.search(r"id 'fabric-loom' version '([^']*)'", build_gradle)
+        versions["loom_version"] = match.group(1) if match else None
+        match = re.search(r'options\.release = (\d+)', build_gradle)
+        versions["java_version"] = match.group(1) if match else None
+        
+        wrapper = (self._read_text(self.gradle_wrapper_properties)
+                   if self.gradle_wrapper_properties.exists() else "")
+        match = re.search(r'gradle-([^/]+?)-(?:bin|all)\.zip', wrapper)
+        versions["gradle_version"] = match.group(1) if match else None
+        return versions
+    
+    def plan_tasks(self, previous_versions: Dict[str, Optional[str]], incremental: bool = False,
+                   ide: bool = True) -> Tuple[List[str], Dict[str, str]]:
+        """Return the Gradle tasks to run and the skipped ones with the reason for each"""
+        skipped = self.plan_skipped_tasks(previous_versions) if incremental else {}
+        if not ide:
+            skipped.update({task: "IDE setup disabled with --no-ide" for task in IDE_TASKS})
+        return [task for task in GRADLE_TASK_TIMEOUTS if task not in skipped], skipped
+    
+    def plan_skipped_tasks(self, previous_versions: Dict[str, Optional[str]]) -> Dict[str, str]:
+        """Return the Gradle tasks an incremental run can skip, with the reason for each"""
+        current_versions = self.read_current_versions()
+        changed = {key for key, value in current_versions.items() if previous_versions.get(key) != value}
+        described = ", ".join(sorted(changed))
+        
+        skipped = {}
+        if not changed & CLEAN_TRIGGERS:
+            reason = f"only {described} changed" if changed else "nothing changed"
+            skipped["clean"] = f"{reason}, keeping compiled classes and Loom caches"
+        if not changed & GEN_SOURCES_TRIGGERS:
+            skipped["genSources"] = f"mappings unchanged ({described} changed)" if changed else "nothing changed"
+        return skipped
+    
+    def remove_stale_jars(self, previous_versions: Dict[str, Optional[str]]) -> List[Path]:
+        """Delete JARs of the previous mod_version that a skipped clean would leave in build/libs"""
+        if previous_versions.get("mod_version") == self.read_current_versions()["mod_version"]:
+            return []
+        jars = sorted((self.project_root / "build" / "libs").glob("*.jar"))
+        for jar in jars:
+            jar.unlink()
+        if jars:
+            print(f"🧹 Removed {len(jars)} JAR(s) built for mod version {previous_versions.get('mod_version')}")
+        return jars
+    
+    def task_waves(self, tasks: List[str]) -> List[List[str]]:
+        """Group the planned steps into waves whose dependencies all ran in earlier waves"""
+        waves: List[List[str]] = []
+        done: Set[str] = set()
+        while len(done) < len(tasks):
+            wave = [task for task in tasks if task not in done
+                    and all(dependency in done or dependency not in tasks
+                            for dependency in GRADLE_STEP_DEPENDENCIES[task])]
+            waves.append(wave)
+            done.update(wave)
+        return waves
+    
+    @staticmethod
+    def step_timings(run: GradleRun, tasks: List[str], offset: float) -> Dict[str, Dict[str, Any]]:
+        """Start/finish offsets of the requested tasks of one invocation, from Gradle's task lines.
+        
+        A step spans from the previous requested task's completion (or the launch,
+        so the first one includes Gradle's startup) to its own.
+        """
+        timings: Dict[str, Dict[str, Any]] = {}
+        previous = 0.0
+        for task in sorted((task for task in tasks if task in run.task_times),
+                           key=lambda task: run.task_times[task]["completed_at"]):
+            completed_at = run.task_times[task]["completed_at"]
+            timings[task] = {"started_at": round(offset + previous, 3), "finished_at": round(offset + completed_at, 3)}
+            previous = completed_at
+        return timings
+    
+    def run_task_graph(self, tasks: List[str]) -> Dict[str, bool]:
+        """Run the post-update steps wave by wave, each once its dependencies have finished.
+        
+        Steps of the same wave share one Gradle invocation, which saves a startup but
+        does not overlap them. Start/finish offsets of every step Gradle reported are
+        recorded in the run report.
+        """
+        steps = {
+            "clean": self.clean_project,
+            "genSources": self.run_gen_sources,
+            "vscode": self.run_vscode_setup,
+            "build": self.build_project,
+        }
+        outcomes: Dict[str, bool] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        start = time.perf_counter()
+        
+        for wave in self.task_waves(tasks):
+            print("\n" + "=" * 60)
+            self.last_gradle_run = None
+            launched_at = time.perf_counter() - start
+            if len(wave) > 1:
+                outcomes.update(self.run_gradle_pipeline(wave))
+            else:
+                task = wave[0]
+                try:
+                    outcomes[task] = steps[task]()
+                except Exception as e:
+                    print(f"✗ {task} failed: {e}")
+                    outcomes[task] = False
+            if self.last_gradle_run is not None:
+                timings.update(self.step_timings(self.last_gradle_run, wave, launched_at))
+            for task in wave:
+                timings.setdefault(task, {})["success"] = outcomes[task]
+        
+        self.report.data["steps"] = timings
+        return {task: outcomes[task] for task in tasks}
+    
+    def run_gradle_phase(self, tasks: List[str], pipeline: bool = False) -> Dict[str, bool]:
+        """Run the post-update Gradle tasks and return per-task success"""
+        self.wait_for_gradle_warm_up()
+        if pipeline:
+            # Run every task in one Gradle invocation
+            print("\n" + "=" * 60)
+            outcomes = self.run_gradle_pipeline(tasks)
+        else:
+            outcomes = self.run_task_graph(tasks)
+        
+        if not outcomes.get("clean", True):
+            print("⚠️  Could not clean project, continuing anyway...")
+        if not outcomes.get("genSources", True):
+            print("⚠️  genSources failed - this may cause issues with IDE integration")
+        if not outcomes.get("vscode", True):
+            print("⚠️  VS Code setup failed - IDE integration may not work properly")
+        return outcomes
+    
+    def bisect_candidates(self, minecraft_version: str) -> Tuple[List[str], List[str]]:
+        """Return the Loom and Fabric API versions worth bisecting over, newest first"""
+        lookups = self._metadata_lookups(minecraft_version)
+        loom_lookup, loom_args = lookups["loom_version"]
+        fabric_api_lookup, fabric_api_args = lookups["fabric_version"]
+        wrapper_gradle = self.read_current_versions()["gradle_version"]
+        # Only Looms the current wrapper can run, so every trial differs in the dependency alone
+        looms = self.resolver.loom_candidates(minecraft_version, loom_lookup(*loom_args) or [], wrapper_gradle)
+        fabric_apis = self.resolver.fabric_api_candidates(minecraft_version,
+                                                          fabric_api_lookup(*fabric_api_args) or [])
+        return looms, fabric_apis
+    
+    def set_dependency_versions(self, loom_version: str, fabric_version: str):
+        """Point build.gradle and gradle.properties at one Loom / Fabric API combination"""
+        build_gradle = self._read_text(self.build_gradle)
+        self._write_if_changed(self.build_gradle, re.sub(r"id 'fabric-loom' version '[^']*'",
+                                                         f"id 'fabric-loom' version '{loom_version}'", build_gradle))
+        properties = PropertiesFile(self._read_text(self.gradle_properties))
+        properties.update({"fabric_version": fabric_version}, add_missing=True)
+        self._write_if_changed(self.gradle_properties, properties.text)
+    
+    def _bisect_newest(self, candidates: List[str], builds: Callable[[str], bool]) -> Optional[str]:
+        """Binary search a newest-first list for the newest version that builds.
+        
+        Assumes that once a version builds, every older one does too.
+        """
+        if not candidates or not builds(candidates[-1]):
+            return None
+        newest_working = candidates[-1]
+        low, high = 0, len(candidates) - 2
+        while low <= high:
+            middle = (low + high) // 2
+            if builds(candidates[middle]):
+                newest_working = candidates[middle]
+                high = middle - 1
+            else:
+                low = middle + 1
+        return newest_working
+    
+    def bisect_build(self, loom_versions: List[str], fabric_api_versions: List[str]) -> Optional[Tuple[str, str]]:
+        """Find the newest (Loom, Fabric API) combination that builds.
+        
+        Both lists are ordered newest first. Fabric API is bisected against the
+        oldest Loom first, then Loom against the Fabric API found, which takes
+        O(log n + log m) builds. The project is left on the combination found, or
+        restored to its original versions if nothing builds.
+        """
+        if not loom_versions or not fabric_api_versions:
+            print("❌ Nothing to bisect - no Loom or Fabric API candidates")
+            return None
+        
+        original = {path: path.read_bytes() for path in (self.build_gradle, self.gradle_properties)}
+        results: Dict[Tuple[str, str], bool] = {}
+        found: Optional[Tuple[str, str]] = None
+        
+        def builds(loom_version: str, fabric_version: str) -> bool:
+            combination = (loom_version, fabric_version)
+            if combination not in results:
+                print(f"\n🔎 [{len(results) + 1}] Fabric Loom {loom_version}, Fabric API {fabric_version}")
+                self.set_dependency_versions(loom_version, fabric_version)
+                # Plain gradlew calls share one warm Gradle daemon across trials
+                run = self.run_gradle(["build"], GRADLE_TASK_TIMEOUTS["build"])
+                results[combination] = run.success
+                print(f"   {'✓ builds' if run.success else '✗ fails'} ({run.duration:.1f}s)")
+            return results[combination]
+        
+        print(f"🔎 Bisecting {len(loom_versions)} Fabric Loom x {len(fabric_api_versions)} Fabric API versions...")
+        try:
+            with self.report.phase("bisect", loom_candidates=len(loom_versions),
+                                   fabric_api_candidates=len(fabric_api_versions)) as phase:
+                # Stop right away if the newest combination already builds
+                if builds(loom_versions[0], fabric_api_versions[0]):
+                    found = (loom_versions[0], fabric_api_versions[0])
+                else:
+                    fabric_version = self._bisect_newest(fabric_api_versions,
+                                                         lambda version: builds(loom_versions[-1], version))
+                    if fabric_version:
+                        loom_version = self._bisect_newest(loom_versions,
+                                                           lambda version: builds(version, fabric_version))
+                        found = (loom_version, fabric_version)
+                phase["builds"] = len(results)
+                phase["result"] = list(found) if found else None
+        finally:
+            if found is None:
+                # Nothing builds, or a trial was interrupted: never leave an untested combination behind
+                for path, data in original.items():
+                    if path.read_bytes() != data:
+                        path.write_bytes(data)
+        
+        print("\n" + "=" * 60)
+        if found is None:
+            print(f"❌ No combination builds ({len(results)} builds tried) - restored the original versions")
+            return None
+        self.set_dependency_versions(*found)
+        print(f"✓ Newest working combination after {len(results)} builds: "
+              f"Fabric Loom {found[0]}, Fabric API {found[1]}")
+        return found
+    
+    def project_files(self) -> List[Path]:
+        """The files a version switch rewrites"""
+        return [self.gradle_properties, self.fabric_mod_json, self.gradle_wrapper_properties, self.build_gradle]
+    
+    def failure_decision(self) -> str:
+        """What the failure analysis of the last build suggests (none if it succeeded)"""
+        if self.last_build_run is None or self.last_build_run.success:
+            return "none"
+        return self.last_build_run.analysis.decision()
+    
+    def update_project_files(self, minecraft_version: str, mod_version: str, suggestions: Dict[str, str]):
+        """Run every file update of a version switch"""
+        with self.report.phase("update gradle.properties") as phase:
+            phase["changed"] = self.update_gradle_properties(minecraft_version, mod_version, suggestions)
+        with self.report.phase("update fabric.mod.json") as phase:
+            phase["changed"] = self.update_fabric_mod_json(minecraft_version, suggestions)
+        with self.report.phase("update gradle-wrapper.properties") as phase:
+            phase["changed"] = self.update_gradle_wrapper(suggestions)
+        with self.report.phase("update build.gradle") as phase:
+            phase["changed"] = self.update_build_gradle(suggestions)
+    
+    def plan_switch(self, minecraft_version: str, mod_version: str, suggestions: Dict[str, str],
+                    incremental: bool = False,
+                    ide: bool = True) -> Tuple[Dict[Path, Tuple[str, str]], List[str], Dict[str, str]]:
+        """Compute what a switch would do without touching the disk.
+        
+        Runs the real update methods against a transaction that is never applied and
+        returns the file changes as (old, new) text, the Gradle tasks that would run
+        and the tasks --incremental would skip.
+        """
+        previous_versions = self.read_current_versions()
+        with self.transaction(apply=False) as transaction:
+            # The update methods report as if they wrote; the diff says it better
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.update_project_files(minecraft_version, mod_version, suggestions)
+            tasks, skipped = self.plan_tasks(previous_versions, incremental, ide)
+        
+        changes = {}
+        for path, data in transaction.staged.items():
+            old = self._read_text(path) if path.exists() else ""
+            new = data.decode('utf-8').replace("\r\n", "\n")
+            if old != new:
+                changes[path] = (old, new)
+        return changes, tasks, skipped
+    
+    def display_plan(self, changes: Dict[Path, Tuple[str, str]], tasks: List[str], skipped: Dict[str, str],
+                     pipeline: bool = False):
+        """Print the unified diff and the Gradle tasks of a planned switch"""
+        print("\n" + "=" * 60)
+        print(f"📝 Dry run - {len(changes)} file(s) would change:\n")
+        for path, (old, new) in changes.items():
+            relative = path.relative_to(self.project_root).as_posix()
+            for line in difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                             fromfile=f"a/{relative}", tofile=f"b/{relative}"):
+                print(line, end="")
+                if not line.endswith("\n"):
+                    print("\n\\ No newline at end of file")
+        
+        print("\nGradle tasks that would run:")
+        if pipeline:
+            print(f"  gradlew {' '.join(tasks)} --continue")
+        else:
+            for wave in self.task_waves(tasks):
+                after = ", ".join(sorted({dependency for task in wave for dependency in GRADLE_STEP_DEPENDENCIES[task]
+                                          if dependency in tasks}))
+                print(f"  gradlew {' '.join(wave)}{f'  (after {after})' if after else ''}")
+        for task, reason in skipped.items():
+            print(f"  (skipped {task}: {reason})")
     
-    def switch_version(self, minecraft_version: str, mod_version: str, auto_yes: bool = False):
+    def switch_version(self, minecraft_version: str, mod_version: str, auto_yes: bool = False,
+                       concurrent: bool = True, pipeline: bool = False, incremental: bool = False,
+                       bisect: bool = False, dry_run: bool = False, ide: bool = True,
+                       rollback_on_failure: bool = False):
         """Main method to switch versions and build the mod"""
         print(f"🔄 Switching Oxify mod to Minecraft {minecraft_version}, mod version {mod_version}")
         print("=" * 60)
         
+        # Start the Gradle daemon while metadata is being fetched
+        if self.gradle_options.warm_up and not dry_run:
+            self.start_gradle_warm_up()
+        
         # Get version suggestions
-        suggestions = self.suggest_versions(minecraft_version)
+        suggestions = self.suggest_versions(minecraft_version, concurrent=concurrent)
+        self.report.data["versions"] = {
+            "minecraft_version": minecraft_version,
+            "mod_version": f"{minecraft_version}-{mod_version}",
+            **{key: value for key, value in suggestions.items() if not key.startswith("_")},
+        }
+        
+        # Download the new artifacts while the user reviews the changes (with -y there is
+        # no prompt to hide the download behind, the Gradle phase would just wait for it)
+        if self.gradle_options.prefetch and not dry_run and not auto_yes:
+            self.start_prefetch(suggestions)
         
         # Display warnings immediately if there are critical issues
         warnings = suggestions.get("_warnings", [])
@@ -483,18 +2931,32 @@ class VersionSwitcher:
             print(f"\n⚠️  {len(warnings)} WARNING(S) - Some versions could not be automatically determined!")
             print("   You will need to manually update some files after this script completes.")
         
+        if dry_run:
+            changes, tasks, skipped = self.plan_switch(minecraft_version, mod_version, suggestions, incremental, ide)
+            self.display_plan(changes, tasks, skipped, pipeline)
+            self.report.data["plan"] = {
+                "changed_files": [path.relative_to(self.project_root).as_posix() for path in changes],
+                "tasks": tasks,
+                "skipped": skipped,
+            }
+            return True
+        
         if not auto_yes:
             confirm = input("\nProceed with these changes? (y/N): ")
             if confirm.lower() not in ['y', 'yes']:
                 print("Aborted.")
+                self.stop_background()
                 return False
         
         try:
-            # Update files
-            self.update_gradle_properties(minecraft_version, mod_version, suggestions)
-            self.update_fabric_mod_json(minecraft_version, suggestions)
-            self.update_gradle_wrapper(suggestions)
-            self.update_build_gradle(suggestions)
+            previous_versions = self.read_current_versions()
+            self.report.data["previous_versions"] = previous_versions
+            
+            snapshot = {path: self._read_text(path) for path in self.project_files() if path.exists()}
+            
+            # Update files: all four are written together or not at all
+            with self.transaction():
+                self.update_project_files(minecraft_version, mod_version, suggestions)
             
             print("\n" + "=" * 60)
             print("📁 Files updated successfully!")
@@ -503,26 +2965,25 @@ class VersionSwitcher:
             if warnings:
                 self.display_warnings(suggestions)
             
-            # Clean project
-            print("\n" + "=" * 60)
-            if not self.clean_project():
-                print("⚠️  Could not clean project, continuing anyway...")
-            
-            # Generate sources
-            print("\n" + "=" * 60)
-            gen_sources_success = self.run_gen_sources()
-            if not gen_sources_success:
-                print("⚠️  genSources failed - this may cause issues with IDE integration")
-            
-            # Setup VS Code integration
-            print("\n" + "=" * 60)
-            vscode_success = self.run_vscode_setup()
-            if not vscode_success:
-                print("⚠️  VS Code setup failed - IDE integration may not work properly")
+            # Decide which Gradle tasks this change actually needs
+            tasks, skipped = self.plan_tasks(previous_versions, incremental, ide)
+            for task, reason in skipped.items():
+                print(f"⏭  Skipping {task}: {reason}")
+                self.report.skip_phase(f"gradle {task}", reason)
+            if "clean" in skipped:
+                self.remove_stale_jars(previous_versions)
+            outcomes = self.run_gradle_phase(tasks, pipeline)
+            outcomes.update({task: True for task in skipped})
+            gen_sources_success = outcomes["genSources"]
+            vscode_success = outcomes["vscode"]
+            build_success = outcomes["build"]
             
-            # Build project
-            print("\n" + "=" * 60)
-            build_success = self.build_project()
+            # Let the failure analysis decide whether a second attempt makes sense
+            decision = self.failure_decision()
+            if not build_success and decision == "retry":
+                print("\n🔁 The build failure looks transient (network problem or timeout), retrying once...")
+                build_success = self.build_project()
+                decision = self.failure_decision()
             
             print("\n" + "=" * 60)
             if build_success:
@@ -545,10 +3006,34 @@ class VersionSwitcher:
                 
                 return True
             else:
+                if bisect:
+                    print("⚠️  Build failed - bisecting Fabric Loom and Fabric API versions...")
+                    found = self.bisect_build(*self.bisect_candidates(minecraft_version))
+                    if found:
+                        self.report.data["versions"].update(loom_version=found[0], fabric_version=found[1])
+                        print(f"🎉 Version switch completed with Fabric Loom {found[0]} and Fabric API {found[1]}")
+                        return True
+                
+                if decision == "rollback" and rollback_on_failure:
+                    print("↩️  The build could not resolve the chosen versions - restoring the previous project files")
+                    with self.transaction():
+                        for path, content in snapshot.items():
+                            self._write_if_changed(path, content)
+                    self.report.data["rolled_back"] = True
+                    return False
+                
                 print("⚠️  Version switch completed, but build failed.")
                 print("This is likely due to breaking changes in the Fabric API or Minecraft.")
                 print("You may need to manually update the code to fix compatibility issues.")
                 
+                if decision == "rollback":
+                    print("The chosen dependency versions could not be resolved or remapped "
+                          "(use --rollback-on-failure to restore the previous files automatically).")
+                elif decision == "fix-code":
+                    print("The failure is in the mod's own code or mixins, see the errors listed above.")
+                    self.display_api_changes(self.last_build_run, previous_versions.get("yarn_mappings"),
+                                             suggestions.get("yarn_mappings"))
+                
                 print("\n📋 Manual steps to complete the upgrade:")
                 print("1. Check the build errors above for specific API changes")
                 print("2. Update your Java code to match the new API signatures")
@@ -574,8 +3059,8 @@ class VersionSwitcher:
         except Exception as e:
             print(f"✗ Error during version switch: {e}")
             print("\n📋 Manual steps to recover:")
-            print("1. Check if gradle.properties and fabric.mod.json are corrupted")
-            print("2. Restore from backup if needed")
+            print("1. Project files are updated all-or-nothing, so they are either all switched or all unchanged")
+            print("2. If the run was killed mid-update, the next run completes it (or use --rollback)")
             print("3. Try running the script again with --yes flag")
             
             if warnings:
@@ -583,6 +3068,8 @@ class VersionSwitcher:
                 self.display_warnings(suggestions)
             
             return False
+        finally:
+            self.stop_background()
 
 def validate_minecraft_version(version: str) -> bool:
     """Validate that the Minecraft version format is correct"""
@@ -594,7 +3081,427 @@ def validate_mod_version(version: str) -> bool:
     pattern = r'^\d+\.\d+(\.\d+)?$'
     return bool(re.match(pattern, version))
 
+def parse_matrix_target(value: str) -> Tuple[str, str]:
+    """Parse a `minecraft_version:mod_version` matrix target"""
+    minecraft_version, sep, mod_version = value.partition(":")
+    if not sep or not validate_minecraft_version(minecraft_version) or not validate_mod_version(mod_version):
+        raise argparse.ArgumentTypeError(
+            f"invalid target '{value}', expected minecraft_version:mod_version (e.g., 1.21.1:1.2.0)")
+    return minecraft_version, mod_version
+
+def add_metadata_arguments(parser: argparse.ArgumentParser):
+    """Add the options controlling metadata lookups and the project location"""
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument('--refresh',
+                            action='store_true',
+                            help='Revalidate all cached metadata with the servers, ignoring the TTLs')
+    cache_mode.add_argument('--offline',
+                            action='store_true',
+                            help='Only use cached metadata, never touch the network')
+    parser.add_argument('--pool-size',
+                        type=int,
+                        default=DEFAULT_POOL_SIZE,
+                        help=f'HTTP connections kept alive per host (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--retries',
+                        type=int,
+                        default=DEFAULT_RETRIES,
+                        help=f'Retries with backoff for failed HTTP requests (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--cache-dir',
+                        type=Path,
+                        default=DEFAULT_CACHE_DIR,
+                        help=f'Metadata cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--project-root', 
+                        type=Path,
+                        default=Path.cwd().parent,
+                        help='Path to the project root (default: parent directory)')
+
+def add_build_arguments(parser: argparse.ArgumentParser):
+    """Add the options controlling how the Gradle phase runs"""
+    parser.add_argument('--single-run',
+                        action='store_true',
+                        help='Run clean, genSources, vscode and build in a single Gradle invocation')
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='Skip clean and genSources when the changed versions do not require them')
+    parser.add_argument('--no-ide',
+                        action='store_true',
+                        help='Skip the IDE setup step (gradlew vscode)')
+    parser.add_argument('--warm-up',
+                        action='store_true',
+                        help='Start a Gradle daemon in the background while metadata is being fetched')
+    parser.add_argument('--prefetch',
+                        action='store_true',
+                        help='Download the new yarn, loader and Fabric API artifacts into the Gradle cache '
+                             'while the confirmation prompt is shown (ignored with --yes)')
+    parser.add_argument('--no-daemon',
+                        action='store_true',
+                        help='Run Gradle without a daemon (default: always use the daemon)')
+    parser.add_argument('--build-cache',
+                        action='store_true',
+                        help='Pass --build-cache to Gradle')
+    parser.add_argument('--configuration-cache',
+                        action='store_true',
+                        help=f'Pass --configuration-cache to Gradle (Gradle {CONFIGURATION_CACHE_GRADLE}+)')
+    parser.add_argument('--rollback-on-failure',
+                        action='store_true',
+                        help='Restore the previous project files if the build cannot resolve the chosen versions')
+    parser.add_argument('--bisect',
+                        action='store_true',
+                        help='If the build fails, bisect Loom and Fabric API versions for the newest that builds')
+
+def check_project_root(project_root: Path) -> Path:
+    """Resolve the project root, exiting if it is not the Oxify mod root"""
+    project_root = project_root.resolve()
+    if not (project_root / "gradle.properties").exists():
+        print(f"Error: No gradle.properties found in {project_root}")
+        print("Please run this script from the Oxify mod root directory.")
+        sys.exit(1)
+    return project_root
+
+def create_switcher(args: argparse.Namespace, project_root: Path,
+                    version_index: Optional[VersionIndex] = None) -> VersionSwitcher:
+    """Create a VersionSwitcher configured from the metadata options"""
+    cache_mode = "refresh" if args.refresh else "offline" if args.offline else "default"
+    cache = MetadataCache(args.cache_dir, cache_mode)
+    session = create_session(args.pool_size, args.retries)
+    return VersionSwitcher(project_root, cache, session, version_index=version_index)
+
+def version_index_main(argv: List[str]) -> int:
+    """Build, update or inspect the local version index"""
+    parser = argparse.ArgumentParser(
+        prog="version_switcher.py version-index",
+        description="Manage the local version index used for offline version resolution",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python version_switcher.py version-index build
+  python version_switcher.py version-index update
+  python version_switcher.py version-index show 1.21.4
+  python version_switcher.py 1.21.4 1.3.1 --use-index
+        """
+    )
+    parser.add_argument('action',
+                        choices=['build', 'update', 'show'],
+                        help='build: fetch everything, update: fetch only what changed, show: print the index')
+    parser.add_argument('minecraft_version',
+                        nargs='?',
+                        help='Minecraft version to show (with "show")')
+    parser.add_argument('--index',
+                        type=Path,
+                        default=DEFAULT_INDEX_PATH,
+                        help=f'Index file (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--recent',
+                        type=int,
+                        default=3,
+                        help='Newest Minecraft versions whose Fabric API list is refreshed on update (default: 3)')
+    add_metadata_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    if args.action == "show":
+        try:
+            VersionIndex.load(args.index).display(args.minecraft_version)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read version index: {e}")
+            return 1
+        return 0
+    
+    index = VersionIndex()
+    if args.action == "update" and args.index.exists():
+        try:
+            index = VersionIndex.load(args.index)
+        except ValueError as e:
+            print(f"⚠️  {e} - rebuilding")
+    
+    # Syncing always revalidates with the servers; unchanged documents cost a 304
+    args.refresh = not args.offline
+    switcher = create_switcher(args, args.project_root.resolve())
+    full = args.action == "build" or not index.data["minecraft"]
+    print(f"{'Building' if full else 'Updating'} version index {args.index}...")
+    start = time.perf_counter()
+    try:
+        stats = index.update(switcher, full=full, recent=args.recent, jobs=args.pool_size)
+    except Exception as e:
+        print(f"❌ Could not update version index: {e}")
+        return 1
+    index.save(args.index)
+    print(f"✓ Indexed {stats['minecraft_versions']} Minecraft versions, fetched Fabric API lists for "
+          f"{stats['fabric_api_fetched']} in {time.perf_counter() - start:.1f}s")
+    if stats["fabric_api_failed"]:
+        print(f"⚠️  {stats['fabric_api_failed']} Fabric API list(s) could not be fetched - kept the previous ones")
+    switcher.cache.display_stats()
+    return 0
+
+def _run_matrix_target(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Switch and build one matrix target inside its worktree (runs in a worker process)"""
+    worktree = Path(job["worktree"])
+    log_path = Path(job["log"])
+    os.environ["GRADLE_USER_HOME"] = job["gradle_user_home"]
+    
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            cache = MetadataCache(Path(job["cache_dir"]), job["cache_mode"])
+            switcher = VersionSwitcher(worktree, cache, create_session(job["pool_size"], job["retries"]))
+            switcher.gradle_options = GradleOptions(**job["gradle_options"])
+            success = switcher.switch_version(job["minecraft_version"], job["mod_version"], auto_yes=True,
+                                              pipeline=job["single_run"], incremental=job["incremental"],
+                                              ide=job["ide"], bisect=job["bisect"],
+                                              rollback_on_failure=job["rollback_on_failure"])
+            cache.display_stats()
+            switcher.report.data["success"] = success
+            switcher.report.write(Path(job["report"]), cache.stats)
+        except Exception as e:
+            print(f"✗ Error while building matrix target: {e}")
+            success = False
+    
+    build_libs = worktree / "build" / "libs"
+    jars = sorted(str(jar) for jar in build_libs.glob("*.jar")) if success and build_libs.exists() else []
+    return {
+        "target": f"{job['minecraft_version']}:{job['mod_version']}",
+        "success": success,
+        "duration": time.perf_counter() - start,
+        "jars": jars,
+        "log": str(log_path),
+        "worktree": str(worktree),
+    }
+
+def create_worktree(project_root: Path, worktree: Path):
+    """Create a detached git worktree of HEAD, replacing any stale one at the same path"""
+    if worktree.exists():
+        subprocess.run(['git', 'worktree', 'remove', '--force', str(worktree)],
+                       cwd=project_root, capture_output=True, text=True)
+        if worktree.exists():
+            shutil.rmtree(worktree)
+    subprocess.run(['git', 'worktree', 'prune'], cwd=project_root, capture_output=True, text=True)
+    result = subprocess.run(['git', 'worktree', 'add', '--detach', str(worktree), 'HEAD'],
+                            cwd=project_root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git worktree add failed: {result.stderr.strip()}")
+
+def remove_worktree(project_root: Path, worktree: Path):
+    """Remove a matrix worktree"""
+    subprocess.run(['git', 'worktree', 'remove', '--force', str(worktree)],
+                   cwd=project_root, capture_output=True, text=True)
+
+def matrix_main(argv: List[str]) -> int:
+    """Switch and build several Minecraft versions in parallel, isolated worktrees"""
+    parser = argparse.ArgumentParser(
+        prog="version_switcher.py matrix",
+        description="Build the Oxify mod for several Minecraft versions in parallel git worktrees",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python version_switcher.py matrix 1.20.4:1.1.0 1.21.1:1.2.0 1.21.4:1.3.1 1.21.5:1.4.0
+  python version_switcher.py matrix 1.21.1:1.2.0 1.21.4:1.3.1 --jobs 2 --single-run
+        """
+    )
+    parser.add_argument('targets',
+                        nargs='+',
+                        type=parse_matrix_target,
+                        help='Targets as minecraft_version:mod_version (e.g., 1.21.1:1.2.0)')
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        default=2,
+                        help='Number of targets built at the same time (default: 2)')
+    parser.add_argument('--worktree-root',
+                        type=Path,
+                        default=Path(tempfile.gettempdir()) / "oxify-matrix",
+                        help='Directory holding one worktree per target (default: system temp dir)')
+    parser.add_argument('--output-dir',
+                        type=Path,
+                        help='Where built JARs are collected (default: <project>/build/matrix)')
+    parser.add_argument('--gradle-user-home',
+                        type=Path,
+                        default=Path(os.environ.get("GRADLE_USER_HOME", Path.home() / ".gradle")),
+                        help='Gradle user home shared by all targets (default: $GRADLE_USER_HOME or ~/.gradle)')
+    parser.add_argument('--keep-worktrees',
+                        action='store_true',
+                        help='Keep worktrees of successful targets (failed ones are always kept)')
+    add_build_arguments(parser)
+    add_metadata_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    project_root = check_project_root(args.project_root)
+    output_dir = (args.output_dir or project_root / "build" / "matrix").resolve()
+    worktree_root = args.worktree_root.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    worktree_root.mkdir(parents=True, exist_ok=True)
+    
+    status = subprocess.run(['git', 'status', '--porcelain'], cwd=project_root, capture_output=True, text=True)
+    if status.stdout.strip():
+        print("⚠️  Worktrees are created from HEAD - uncommitted changes are not part of the matrix build")
+    
+    cache_mode = "refresh" if args.refresh else "offline" if args.offline else "default"
+    jobs = []
+    for minecraft_version, mod_version in args.targets:
+        worktree = worktree_root / f"{minecraft_version}-{mod_version}"
+        print(f"Creating worktree for {minecraft_version}:{mod_version} at {worktree}...")
+        create_worktree(project_root, worktree)
+        jobs.append({
+            "minecraft_version": minecraft_version,
+            "mod_version": mod_version,
+            "worktree": str(worktree),
+            "log": str(output_dir / f"{minecraft_version}-{mod_version}.log"),
+            "report": str(output_dir / f"{minecraft_version}-{mod_version}.report.json"),
+            "gradle_user_home": str(args.gradle_user_home.resolve()),
+            "cache_dir": str(args.cache_dir),
+            "cache_mode": cache_mode,
+            "pool_size": args.pool_size,
+            "retries": args.retries,
+            "single_run": args.single_run,
+            "incremental": args.incremental,
+            "ide": not args.no_ide,
+            "bisect": args.bisect,
+            "rollback_on_failure": args.rollback_on_failure,
+            "gradle_options": asdict(GradleOptions.from_args(args)),
+        })
+    
+    print(f"\n🔄 Building {len(jobs)} target(s) with up to {args.jobs} in parallel...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(_run_matrix_target, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{'✓' if result['success'] else '✗'} {result['target']} finished in {result['duration']:.1f}s")
+    wall_clock = time.perf_counter() - start
+    
+    # Collect the JARs and clean up the worktrees that are no longer needed
+    for result in results:
+        collected = []
+        for jar in result["jars"]:
+            shutil.copy2(jar, output_dir / Path(jar).name)
+            collected.append(Path(jar).name)
+        result["jars"] = collected
+        if result["success"] and not args.keep_worktrees:
+            remove_worktree(project_root, Path(result["worktree"]))
+    
+    print("\n" + "=" * 80)
+    print(f"{'Target':<18} {'Result':<8} {'Time':>8}  JARs / log")
+    print("-" * 80)
+    for result in sorted(results, key=lambda r: r["target"]):
+        shown = ", ".join(result["jars"]) if result["success"] else result["log"]
+        print(f"{result['target']:<18} {'ok' if result['success'] else 'FAILED':<8} {result['duration']:>7.1f}s  {shown}")
+    print("-" * 80)
+    serial_total = sum(result["duration"] for result in results)
+    print(f"Wall clock {wall_clock:.1f}s (sum of targets {serial_total:.1f}s) - JARs collected in {output_dir}")
+    
+    return 0 if all(result["success"] for result in results) else 1
+
+def bisect_main(argv: List[str]) -> int:
+    """Find the newest Loom / Fabric API combination that builds the current project"""
+    parser = argparse.ArgumentParser(
+        prog="version_switcher.py bisect",
+        description="Binary-search Fabric Loom and Fabric API versions for the newest combination that builds",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Candidates default to every published version compatible with the project's
+Minecraft version and Gradle wrapper. Explicit lists are tried newest first.
+
+Examples:
+  python version_switcher.py bisect
+  python version_switcher.py bisect --loom 1.10.5 1.10.1 1.9.2
+  python version_switcher.py bisect --fabric-api 0.128.1+1.21.5 0.127.0+1.21.5 --report bisect.json
+        """
+    )
+    parser.add_argument('--loom', nargs='+', metavar='VERSION', help='Fabric Loom versions to try')
+    parser.add_argument('--fabric-api', nargs='+', metavar='VERSION', help='Fabric API versions to try')
+    parser.add_argument('--report', type=Path, help='Write a JSON report of the bisection')
+    add_metadata_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    project_root = check_project_root(args.project_root)
+    switcher = create_switcher(args, project_root)
+    minecraft_version = switcher.read_current_versions()["minecraft_version"]
+    if not minecraft_version:
+        print("Error: No minecraft_version property found in gradle.properties")
+        return 1
+    
+    looms, fabric_apis = [], []
+    if not args.loom or not args.fabric_api:
+        looms, fabric_apis = switcher.bisect_candidates(minecraft_version)
+    looms = sorted(args.loom, key=parse_version, reverse=True) if args.loom else looms
+    fabric_apis = sorted(args.fabric_api, key=parse_version, reverse=True) if args.fabric_api else fabric_apis
+    
+    found = switcher.bisect_build(looms, fabric_apis)
+    if args.report:
+        switcher.report.data["success"] = found is not None
+        switcher.report.write(args.report, switcher.cache.stats)
+    return 0 if found else 1
+
+def yarn_diff_main(argv: List[str]) -> int:
+    """Build the yarn diff index between two versions and query it"""
+    parser = argparse.ArgumentParser(
+        prog="version_switcher.py yarn-diff",
+        description="Index the classes, methods and fields yarn renamed, moved or removed between two versions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+The index is built once per pair of versions and kept in the metadata cache.
+Names are looked up the way they are written in Java, as short or as qualified
+as needed: ItemUsageContext, Item.Settings, Item.useOnBlock, useOnBlock.
+
+Examples:
+  python version_switcher.py yarn-diff 1.21.4+build.8 1.21.5+build.1
+  python version_switcher.py yarn-diff 1.21.4+build.8 1.21.5+build.1 ItemUsageContext Item.useOnBlock
+  python version_switcher.py yarn-diff --from-project 1.21.5+build.1 Items.register
+        """
+    )
+    parser.add_argument('versions', nargs='+', metavar='VERSION_OR_NAME',
+                        help='Old and new yarn_mappings versions, then the names to look up')
+    parser.add_argument('--from-project', action='store_true',
+                        help="Use the project's current yarn_mappings as the old version")
+    parser.add_argument('--rebuild', action='store_true', help='Build the index again even if it exists')
+    add_metadata_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    switcher = create_switcher(args, args.project_root.resolve())
+    arguments = list(args.versions)
+    if args.from_project:
+        old_yarn = switcher.read_current_versions()["yarn_mappings"]
+        if not old_yarn:
+            print("Error: No yarn_mappings property found in gradle.properties")
+            return 1
+        arguments.insert(0, old_yarn)
+    if len(arguments) < 2:
+        parser.error("both the old and the new yarn version are needed")
+    old_yarn, new_yarn, names = arguments[0], arguments[1], arguments[2:]
+    
+    start = time.perf_counter()
+    try:
+        diff = switcher.yarn_diff(old_yarn, new_yarn, rebuild=args.rebuild)
+    except (requests.exceptions.RequestException, OSError, ValueError, zipfile.BadZipFile, KeyError) as e:
+        print(f"❌ Could not build the yarn diff index: {e}")
+        return 1
+    if diff is None:
+        print(f"❌ Yarn mappings for {old_yarn} or {new_yarn} are not in the Gradle cache and could not be downloaded")
+        return 1
+    changes = ", ".join(f"{count} {status}" for status, count in diff.meta["changes"].items()) or "no changes"
+    print(f"🔎 Yarn {old_yarn} → {new_yarn}: {changes} ({time.perf_counter() - start:.2f}s, {diff.path})")
+    
+    for name in names:
+        found = diff.find(name)
+        print(f"\n{name}:")
+        if not found:
+            print(f"   unchanged (or not a yarn {old_yarn} name)")
+        for change in found:
+            print(f"   - {change['kind']} {change['old']}")
+            print(f"     {change['status']}: {change['new'] or 'no longer exists'}")
+    diff.close()
+    return 0
+
 def main():
+    # Subcommands are dispatched before the classic "<minecraft_version> <mod_version>" form
+    commands = {
+        "bisect": bisect_main,
+        "matrix": matrix_main,
+        "version-index": version_index_main,
+        "yarn-diff": yarn_diff_main,
+    }
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        sys.exit(commands[sys.argv[1]](sys.argv[2:]))
+    
     parser = argparse.ArgumentParser(
         description="Switch Minecraft and mod versions for the Oxify mod",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -613,10 +3520,26 @@ Examples:
     parser.add_argument('-y', '--yes', 
                         action='store_true',
                         help='Skip confirmation prompts')
-    parser.add_argument('--project-root', 
+    parser.add_argument('--serial',
+                        action='store_true',
+                        help='Resolve metadata lookups one after another instead of concurrently')
+    parser.add_argument('--report',
                         type=Path,
-                        default=Path.cwd().parent,
-                        help='Path to the project root (default: parent directory)')
+                        help='Write a JSON report with phase timings, exit codes and chosen versions')
+    parser.add_argument('--dry-run',
+                        action='store_true',
+                        help='Print the file diff and Gradle tasks of the switch without changing anything')
+    parser.add_argument('--rollback',
+                        action='store_true',
+                        help='Roll back a previously interrupted file update instead of completing it')
+    parser.add_argument('--use-index',
+                        nargs='?',
+                        type=Path,
+                        const=DEFAULT_INDEX_PATH,
+                        metavar='INDEX',
+                        help=f'Resolve versions from the local version index (default: {DEFAULT_INDEX_PATH})')
+    add_build_arguments(parser)
+    add_metadata_arguments(parser)
     
     args = parser.parse_args()
     
@@ -632,15 +3555,33 @@ Examples:
         sys.exit(1)
     
     # Check if we're in a valid project directory
-    project_root = args.project_root.resolve()
-    if not (project_root / "gradle.properties").exists():
-        print(f"Error: No gradle.properties found in {project_root}")
-        print("Please run this script from the Oxify mod root directory.")
-        sys.exit(1)
+    project_root = check_project_root(args.project_root)
+    
+    version_index = None
+    if args.use_index:
+        try:
+            version_index = VersionIndex.load(args.use_index)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read version index: {e}")
+            print("Build it first with: python version_switcher.py version-index build")
+            sys.exit(1)
     
     # Initialize version switcher and run
-    switcher = VersionSwitcher(project_root)
-    success = switcher.switch_version(args.minecraft_version, args.mod_version, args.yes)
+    switcher = create_switcher(args, project_root, version_index)
+    switcher.gradle_options = GradleOptions.from_args(args)
+    if args.dry_run:
+        if FileTransaction(project_root).pending() is not None:
+            print("⚠️  An interrupted version switch is pending; the plan is based on the files as they are now")
+    else:
+        switcher.recover_interrupted_update(rollback=args.rollback)
+    success = switcher.switch_version(args.minecraft_version, args.mod_version, args.yes,
+                                      concurrent=not args.serial, pipeline=args.single_run,
+                                      incremental=args.incremental, bisect=args.bisect, dry_run=args.dry_run,
+                                      ide=not args.no_ide, rollback_on_failure=args.rollback_on_failure)
+    switcher.cache.display_stats()
+    if args.report:
+        switcher.report.data["success"] = success
+        switcher.report.write(args.report, switcher.cache.stats)
     
     sys.exit(0 if success else 1)
 